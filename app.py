@@ -1,30 +1,132 @@
+import os
+
 import streamlit as st
-import pandas as pd
-from io import BytesIO
-from matplotlib import pyplot as plt
+
+from charts import CHART_MODES, DEFAULT_CHART_MODE, bar_chart_png, native_bar_data
+from compare import ADDED, MANAGER_CHANGED, REMOVED, STATUS_CHANGED, UNCHANGED
+from diagnostics import StageRecorder, log_stages
+from export import EXPORT_FORMATS, export_file_name, export_mime, lazy_export
+from grid import GRID_PAGE_SIZES, grid_order, page_count, page_rows
+from jobs import CANCELLED, FAILED, JOBS
+from loader import file_name
+from managers import ALL_MANAGERS
+from pipeline import (
+    RESULT_CACHE,
+    compare_job,
+    compare_pipeline,
+    extend_timeline,
+    extract_active,
+    listed_snapshots,
+    source_token,
+    unknown_statuses,
+)
+from snapshots import SNAPSHOT_STORE
 
 
 st.set_page_config(page_title="Active Job Tracker", layout="wide")
 
 st.title("📊 Active Job & Interview Tracker")
 
+# Per-stage timings as JSON lines on stderr, for production monitoring
+if os.environ.get("PIPELINE_STAGE_LOG"):
+    log_stages()
+
 # ------------------ Helper Functions ------------------
-def read_file(file):
-    name = file.name.lower()
-    if name.endswith(".csv"):
-        return pd.read_csv(file)
-    return pd.read_excel(file, engine="openpyxl")
+def download_button(label, df, file_stem, fmt, recorder=None, **kwargs):
+    # Serialized only when clicked, and cached by the frame's content hash
+    data = lazy_export(df, fmt)
+    if recorder is not None:
+        # Runs after this rerun has rendered, so it only reaches the stage log
+        data = recorder.wrap(f"export {export_file_name(file_stem, fmt)}", data)
+    return st.download_button(
+        label,
+        data=data,
+        file_name=export_file_name(file_stem, fmt),
+        mime=export_mime(fmt),
+        on_click="ignore",
+        **kwargs
+    )
 
 
-def to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False)
-    return output.getvalue()
+def paginated_grid(df, key, page_size=100):
+    # Search and sort run server-side; only the visible page is sent to the browser
+    col_search, col_sort, col_order, col_size = st.columns([3, 2, 1, 1])
+    with col_search:
+        query = st.text_input("Search", key=f"{key}_search", placeholder="Search all columns")
+    with col_sort:
+        sort_by = st.selectbox(
+            "Sort by",
+            options=[None] + list(df.columns),
+            format_func=lambda col: "—" if col is None else str(col),
+            key=f"{key}_sort"
+        )
+    with col_order:
+        descending = st.checkbox("Descending", key=f"{key}_desc", disabled=sort_by is None)
+    with col_size:
+        page_size = st.selectbox(
+            "Rows per page",
+            options=GRID_PAGE_SIZES,
+            index=GRID_PAGE_SIZES.index(page_size),
+            key=f"{key}_size"
+        )
 
+    positions = grid_order(df, query, sort_by, not descending)
+    pages = page_count(len(positions), page_size)
+
+    # Back to the first page whenever the rows or their order change
+    view = (len(df), query, sort_by, descending, page_size)
+    page_key = f"{key}_page"
+    if st.session_state.get(f"{key}_view") != view:
+        st.session_state[f"{key}_view"] = view
+        st.session_state[page_key] = 1
+
+    page = st.number_input("Page", min_value=1, max_value=pages, key=page_key) if pages > 1 else 1
+    st.dataframe(page_rows(df, positions, page, page_size), use_container_width=True)
+
+    start = (page - 1) * page_size
+    shown = f"Rows {start + 1}–{min(start + page_size, len(positions))} of {len(positions)}" if len(positions) else "No matching rows"
+    searched = f"; {len(df)} rows before search" if query.strip() else ""
+    st.caption(f"{shown} (page {page} of {pages}{searched})")
+
+
+@st.fragment(run_every=0.5)
+def job_progress(job):
+    # Polls the background job without rerunning the rest of the page
+    if job.finished:
+        st.rerun()
+    label = job.phase or "Queued"
+    st.progress(job.progress, text=f"{label} · {job.stage}" if job.stage else label)
+    for message in job.messages:
+        st.caption(message)
+    if st.button("✖️ Cancel comparison", key=f"cancel_{job.id}"):
+        job.cancel()
+        st.rerun()
+
+
+def warn_unknown_statuses(df, source):
+    unknown = unknown_statuses(df)
+    if unknown:
+        listed = ", ".join(f"'{status}' ({rows} rows)" for status, rows in unknown.items())
+        st.warning(f"⚠️ {source}: statuses not listed in statuses.json were treated as inactive: {listed}")
+
+
+export_format = st.radio(
+    "Download format",
+    options=list(EXPORT_FORMATS),
+    format_func=str.upper,
+    horizontal=True
+)
+
+chart_mode = st.radio(
+    "Chart rendering",
+    options=list(CHART_MODES),
+    index=list(CHART_MODES).index(DEFAULT_CHART_MODE) if DEFAULT_CHART_MODE in CHART_MODES else 0,
+    format_func=CHART_MODES.get,
+    horizontal=True
+)
 
 # ------------------ Tabs ------------------
-tab1, tab2 = st.tabs(["📂 Active Extract", "🔍 Compare Old vs New"])
+tab1, tab2, tab3 = st.tabs(["📂 Active Extract", "🔍 Compare Old vs New", "📈 Timeline"])
 
 
 # =====================================================
@@ -40,34 +142,35 @@ with tab1:
     )
 
     if uploaded_file:
-        df = read_file(uploaded_file)
-
-        if "Status" not in df.columns:
-            st.error("❌ 'Status' column not found.")
+        # Kept per upload, so other widget changes don't reach the parser and the
+        # grid is handed the same frame on every rerun
+        extract = st.session_state.get("extract")
+        try:
+            if extract is None or extract[0] != source_token(uploaded_file):
+                extract = (source_token(uploaded_file), extract_active(uploaded_file))
+                st.session_state["extract"] = extract
+        except ValueError as exc:
+            st.error(f"❌ {exc}")
         else:
-            active_df = df[
-                df["Status"].astype(str).str.strip().str.lower() == "active"
-            ].copy()
-
-            # Add Hiring Manager column if missing
-            if "Hiring Manager" not in active_df.columns:
-                active_df["Hiring Manager"] = ""
-
+            active_df = extract[1]
+            warn_unknown_statuses(active_df, file_name(uploaded_file))
             st.subheader("🔍 Preview: Active Requests")
 
             if active_df.empty:
                 st.warning("No Active records found.")
             else:
-                st.dataframe(active_df, use_container_width=True)
+                paginated_grid(active_df, "grid_single")
 
-                st.download_button(
+                download_button(
                     "⬇️ Download Active Requests",
-                    data=to_excel(active_df),
-                    file_name="active_requests.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    active_df,
+                    "active_requests",
+                    export_format
                 )
 
                 st.success(f"✅ {len(active_df)} Active requests extracted")
+    else:
+        st.session_state.pop("extract", None)
 
 
 with tab2:
@@ -89,42 +192,85 @@ with tab2:
             key="new"
         )
 
-    if old_file and new_file:
-        if st.button("🔍 Extract Active Statuses from Both Files"):
-            # ---------- READ FILES ----------
-            old_df = read_file(old_file)
-            new_df = read_file(new_file)
-
-            # ---------- VALIDATE ----------
-            for col in ["Request ID", "Status"]:
-                if col not in old_df.columns or col not in new_df.columns:
-                    st.error(f"❌ '{col}' column missing in one of the files")
-                    st.stop()
-
-            # ---------- NORMALIZE DATA ----------
-            for df in [old_df, new_df]:
-                df["Request ID"] = (
-                    df["Request ID"]
-                    .astype(str)
-                    .str.replace(".0", "", regex=False)
-                    .str.strip()
+    # ---------- PREVIOUSLY LOADED SNAPSHOTS ----------
+    stored_snapshots = listed_snapshots(SNAPSHOT_STORE)
+    old_snapshot = new_snapshot = None
+    if stored_snapshots:
+        with st.expander("📦 Or compare previously loaded snapshots"):
+            col_snap1, col_snap2 = st.columns(2)
+            with col_snap1:
+                old_snapshot = st.selectbox(
+                    "Stored OLD snapshot",
+                    options=[None] + stored_snapshots,
+                    format_func=lambda s: "—" if s is None else s.describe(),
+                    disabled=old_file is not None
+                )
+            with col_snap2:
+                new_snapshot = st.selectbox(
+                    "Stored NEW snapshot",
+                    options=[None] + stored_snapshots,
+                    format_func=lambda s: "—" if s is None else s.describe(),
+                    disabled=new_file is not None
                 )
-                df["Status"] = df["Status"].astype(str).str.strip().str.lower()
 
-            # ---------- DEFINE ACTIVE STATUS PATTERNS ----------
-            active_status_patterns = ["active", "partially", "zero", "filled"]
-            pattern = '|'.join(active_status_patterns)
+    # An upload always takes precedence over a stored snapshot
+    old_source = old_file or old_snapshot
+    new_source = new_file or new_snapshot
 
-            # ---------- EXTRACT ACTIVE STATUSES FROM BOTH FILES ----------
-            # From OLD file
-            old_active = old_df[
-                old_df["Status"].str.contains(pattern, case=False, na=False)
-            ].copy()
-            
-            # From NEW file
-            new_active = new_df[
-                new_df["Status"].str.contains(pattern, case=False, na=False)
-            ].copy()
+    compact_load = st.checkbox(
+        "Load only comparison columns (recommended for very large extracts)",
+        help="Also skips the other columns that aren't compared; the OLD/NEW views and downloads then show only the compared columns"
+    )
+    trace_memory = st.checkbox(
+        "Record peak memory per stage in diagnostics",
+        help="Uses tracemalloc, which makes the comparison noticeably slower"
+    )
+
+    compare_inputs = None
+    if old_source and new_source:
+        compare_inputs = (source_token(old_source), source_token(new_source), compact_load)
+        if st.button("🔍 Extract Active Statuses from Both Files"):
+            previous_job = JOBS.get(st.session_state.get("compare_job"))
+            if previous_job is not None:
+                previous_job.cancel()
+            if "compare_pipeline" not in st.session_state:
+                # Sessions comparing the same extracts share one copy through RESULT_CACHE
+                st.session_state["compare_pipeline"] = compare_pipeline(store=SNAPSHOT_STORE, shared=RESULT_CACHE)
+            # One pipeline per session, reused by each job: new inputs release the old results
+            pipeline = st.session_state["compare_pipeline"]
+            # Parsing and comparison run on the job pool; this script only polls
+            job = JOBS.submit(
+                compare_job(pipeline, old_source, new_source, compact_load), trace_memory=trace_memory,
+                pipeline=pipeline, inputs=compare_inputs
+            )
+            st.session_state["compare_job"] = job.id
+            # Kept in the URL as well, so a refreshed page reattaches to the job
+            st.query_params["job"] = job.id
+
+    job = JOBS.get(st.session_state.get("compare_job") or st.query_params.get("job"))
+    # Different uploads wait for a new click; with none (e.g. after a refresh) the job is shown
+    if job is not None and compare_inputs not in (None, job.context["inputs"]):
+        job = None
+
+    if job is not None:
+        st.session_state["compare_job"] = job.id
+        # After a refresh this session takes over the job's pipeline
+        st.session_state["compare_pipeline"] = job.context["pipeline"]
+        if not job.finished:
+            job_progress(job)
+        elif job.state == CANCELLED:
+            st.info("Comparison cancelled.")
+        elif job.state == FAILED:
+            st.error(f"❌ {job.error}")
+        else:
+            # Loading and comparing already ran in the job; these are memoized lookups.
+            # Later reruns only recompute the stages whose inputs changed.
+            session = job.context["pipeline"]
+            recorder = StageRecorder(trace_memory=trace_memory)
+            old_active, new_active = session.get("load")
+
+            warn_unknown_statuses(old_active, "OLD file")
+            warn_unknown_statuses(new_active, "NEW file")
 
             # ---------- CHECK IF WE FOUND ANY ACTIVE STATUSES ----------
             st.write("📊 **Active Status Records Found:**")
@@ -133,381 +279,323 @@ with tab2:
             with col_old:
                 st.metric("OLD File", len(old_active))
                 if not old_active.empty:
-                    st.write("Statuses in OLD:", old_active["Status"].unique())
+                    st.write("Statuses in OLD:", old_active["Status"].drop_duplicates().to_numpy())
             
             with col_new:
                 st.metric("NEW File", len(new_active))
                 if not new_active.empty:
-                    st.write("Statuses in NEW:", new_active["Status"].unique())
+                    st.write("Statuses in NEW:", new_active["Status"].drop_duplicates().to_numpy())
 
             if old_active.empty and new_active.empty:
                 st.warning("⚠️ No active status records found in either file!")
-                st.stop()
-
-            # ---------- CREATE COMPARISON DATAFRAME ----------
-            comparison_data = []
-            
-            # Add records from OLD file
-            for _, row in old_active.iterrows():
-                comparison_data.append({
-                    "Source": "OLD",
-                    "Request ID": row["Request ID"],
-                    "Status": row["Status"],
-                    "Hiring Manager": row.get("Hiring Manager", ""),
-                    "Job Title": row.get("Job Title", ""),
-                    "Interviewed?": row.get("Interviewed?", ""),
-                    "Work Site Name": row.get("Work Site Name", ""),
-                    "Total Positions": row.get("Total Positions", "")
-                })
-            
-            # Add records from NEW file
-            for _, row in new_active.iterrows():
-                comparison_data.append({
-                    "Source": "NEW",
-                    "Request ID": row["Request ID"],
-                    "Status": row["Status"],
-                    "Hiring Manager": row.get("Hiring Manager", ""),
-                    "Job Title": row.get("Job Title", ""),
-                    "Interviewed?": row.get("Interviewed?", ""),
-                    "Work Site Name": row.get("Work Site Name", ""),
-                    "Total Positions": row.get("Total Positions", "")
-                })
-            
-            comparison_df = pd.DataFrame(comparison_data)
-            
-            # ---------- STANDARDIZE STATUS NAMES ----------
-            status_mapping = {
-                "partiallyfilled": "partially filled",
-                "partially-filled": "partially filled",
-                "zerofilled": "zero filled",
-                "zero-filled": "zero filled"
-            }
-            
-            comparison_df["Status"] = (
-                comparison_df["Status"]
-                .replace(status_mapping)
-                .str.title()
-            )
-
-            # ---------- CREATE FINAL DOWNLOAD DATAFRAME ----------
-            # This will contain Active, Partially Filled, Zero Filled from BOTH files
-            final_download_df = comparison_df.copy()
-            
-            # Add source identification
-            final_download_df["File Source"] = final_download_df["Source"]
-            
-            # Sort by Status then Request ID
-            status_order = {
-                "Active": 1,
-                "Partially Filled": 2,
-                "Zero Filled": 3
-            }
-            
-            final_download_df["Status_Order"] = (
-                final_download_df["Status"]
-                .map(status_order)
-                .fillna(99)
-            )
-            
-            final_download_df = final_download_df.sort_values(["Status_Order", "Request ID"])
-            final_download_df = final_download_df.drop("Status_Order", axis=1)
-            final_download_df = final_download_df.reset_index(drop=True)
-
-            # ---------- CREATE MERGED VIEW FOR COMPARISON ----------
-            # Create a merged view showing OLD vs NEW side by side
-            if not old_active.empty and not new_active.empty:
-                # Pivot to compare OLD vs NEW
-                pivot_df = comparison_df.pivot_table(
-                    index="Request ID",
-                    columns="Source",
-                    values=["Status", "Hiring Manager"],
-                    aggfunc='first'
-                )
-                
-                # Flatten column names
-                pivot_df.columns = [f"{col[1]}_{col[0]}" for col in pivot_df.columns]
-                pivot_df = pivot_df.reset_index()
-                
-                # Rename columns for clarity
-                pivot_df = pivot_df.rename(columns={
-                    "OLD_Status": "Status (OLD)",
-                    "NEW_Status": "Status (NEW)",
-                    "OLD_Hiring Manager": "Hiring Manager (OLD)",
-                    "NEW_Hiring Manager": "Hiring Manager (NEW)"
-                })
+            else:
+                # ---------- COMPARE ----------
+                result = session.get("compare")
+                final_download_df = result.final_df
+                diff = result.diff
+
+                # ---------- DISPLAY RESULTS ----------
+                st.subheader("📋 Active Status Records from Both Files")
+
+                # Create tabs for different views
+                tab_combined, tab_old, tab_new, tab_comparison, tab_hm_analysis = st.tabs([
+                    "📄 Combined View",
+                    "📁 OLD File Only",
+                    "📁 NEW File Only",
+                    "🔄 Comparison View",
+                    "👥 Hiring Manager Analysis"
+                ])
+
+                with tab_combined:
+                    st.write("**All Active Status Records (OLD + NEW):**")
+                    paginated_grid(final_download_df, "grid_combined")
                 
-                # Add status change indicator
-                pivot_df["Status Changed?"] = pivot_df.apply(
-                    lambda row: "Yes" if str(row.get("Status (OLD)", "")).lower() != str(row.get("Status (NEW)", "")).lower() 
-                    and pd.notna(row.get("Status (OLD)")) and pd.notna(row.get("Status (NEW)"))
-                    else "No",
-                    axis=1
-                )
+                    # Show statistics
+                    st.write("**Statistics by Source:**")
+                    source_stats = session.get("source_stats")
+                    st.dataframe(source_stats, use_container_width=True)
+
+                with tab_old:
+                    if not old_active.empty:
+                        st.write(f"**Active Statuses from OLD File ({len(old_active)} records):**")
+                        # Free-text columns are read from the extract only when asked for
+                        if result.old_text is not None and st.toggle("Show free-text columns", key="old_text"):
+                            old_display = session.get("old_with_text")
+                        else:
+                            old_display = session.get("old_display")
+                        paginated_grid(old_display, "grid_old")
+                    else:
+                        st.info("No active status records found in OLD file")
 
-            # ---------- DISPLAY RESULTS ----------
-            st.subheader("📋 Active Status Records from Both Files")
-
-            # Create tabs for different views
-            tab_combined, tab_old, tab_new, tab_comparison, tab_hm_analysis = st.tabs([
-                "📄 Combined View",
-                "📁 OLD File Only",
-                "📁 NEW File Only",
-                "🔄 Comparison View",
-                "👥 Hiring Manager Analysis"
-            ])
-
-            with tab_combined:
-                st.write("**All Active Status Records (OLD + NEW):**")
-                st.dataframe(final_download_df, use_container_width=True)
-                
-                # Show statistics
-                st.write("**Statistics by Source:**")
-                source_stats = final_download_df.groupby(["Source", "Status"]).size().unstack(fill_value=0)
-                st.dataframe(source_stats, use_container_width=True)
+                with tab_new:
+                    if not new_active.empty:
+                        st.write(f"**Active Statuses from NEW File ({len(new_active)} records):**")
+                        if result.new_text is not None and st.toggle("Show free-text columns", key="new_text"):
+                            new_display = session.get("new_with_text")
+                        else:
+                            new_display = session.get("new_display")
+                        paginated_grid(new_display, "grid_new")
+                    else:
+                        st.info("No active status records found in NEW file")
 
-            with tab_old:
-                if not old_active.empty:
-                    st.write(f"**Active Statuses from OLD File ({len(old_active)} records):**")
-                    old_display = old_active.copy()
-                    old_display["Status"] = old_display["Status"].str.title()
-                    st.dataframe(old_display, use_container_width=True)
-                else:
-                    st.info("No active status records found in OLD file")
-
-            with tab_new:
-                if not new_active.empty:
-                    st.write(f"**Active Statuses from NEW File ({len(new_active)} records):**")
-                    new_display = new_active.copy()
-                    new_display["Status"] = new_display["Status"].str.title()
-                    st.dataframe(new_display, use_container_width=True)
-                else:
-                    st.info("No active status records found in NEW file")
-
-            with tab_comparison:
-                if 'pivot_df' in locals() and not pivot_df.empty:
-                    st.write("**Side-by-Side Comparison:**")
-                    st.dataframe(pivot_df, use_container_width=True)
+                with tab_comparison:
+                    if diff is not None and not diff.empty:
+                        st.write("**Side-by-Side Comparison:**")
+                        paginated_grid(diff.view, "grid_comparison")
                     
-                    # Show comparison statistics
-                    if "Status Changed?" in pivot_df.columns:
-                        changed_count = pivot_df["Status Changed?"].eq("Yes").sum()
-                        st.metric("Status Changed Records", changed_count)
-                else:
-                    st.info("Comparison view requires data in both files")
-
-            with tab_hm_analysis:
-                st.subheader("👥 Hiring Manager Analysis")
-                
-                # ---------- HIRING MANAGER FILTER ----------
-                # Get all unique hiring managers
-                all_hiring_managers = []
-                for df in [old_active, new_active]:
-                    if "Hiring Manager" in df.columns:
-                        # Clean hiring manager names
-                        df["Hiring Manager"] = df["Hiring Manager"].astype(str).str.strip()
-                        hm_list = df["Hiring Manager"].dropna().unique().tolist()
-                        all_hiring_managers.extend(hm_list)
+                        # Show comparison statistics
+                        st.metric("Status Changed Records", diff.count(STATUS_CHANGED))
+                        change_cols = st.columns(4)
+                        for change_col, change in zip(change_cols, [ADDED, REMOVED, MANAGER_CHANGED, UNCHANGED]):
+                            with change_col:
+                                st.metric(change, diff.count(change))
+                    else:
+                        st.info("Comparison view requires data in both files")
+
+                with tab_hm_analysis:
+                    st.subheader("👥 Hiring Manager Analysis")
                 
-                # Remove empty strings and get unique values
-                all_hiring_managers = [hm for hm in all_hiring_managers if hm and hm not in ["nan", "None", "null", ""]]
-                all_hiring_managers = sorted(list(set(all_hiring_managers)))
+                    # ---------- HIRING MANAGER FILTER ----------
+                    # Aggregates are precomputed once per comparison result
+                    manager_index = session.get("manager_index", recorder=recorder)
+                    all_hiring_managers = manager_index.managers
                 
-                if all_hiring_managers:
-                    # Filter section
-                    col_filter1, col_filter2 = st.columns([2, 1])
-                    
-                    with col_filter1:
-                        selected_hiring_manager = st.selectbox(
-                            "🔍 Select Hiring Manager to Filter:",
-                            options=["All Hiring Managers"] + all_hiring_managers,
-                            index=0
-                        )
+                    if all_hiring_managers:
+                        # Filter section
+                        col_filter1, col_filter2 = st.columns([2, 1])
                     
-                    with col_filter2:
-                        show_source = st.selectbox(
-                            "Show Data from:",
-                            options=["Both Files", "OLD File Only", "NEW File Only"]
-                        )
-                    
-                    # ---------- HIRING MANAGER STATISTICS ----------
-                    st.write("### 📊 Hiring Manager Statistics")
-                    
-                    # Calculate request counts per hiring manager
-                    hm_stats_data = []
+                        with col_filter1:
+                            selected_hiring_manager = st.selectbox(
+                                "🔍 Select Hiring Manager to Filter:",
+                                options=[ALL_MANAGERS] + all_hiring_managers,
+                                index=0
+                            )
                     
-                    # For OLD file
-                    if not old_active.empty and "Hiring Manager" in old_active.columns:
-                        old_hm_counts = old_active.groupby("Hiring Manager")["Request ID"].nunique().reset_index()
-                        old_hm_counts.columns = ["Hiring Manager", "Request Count (OLD)"]
-                        hm_stats_data.append(old_hm_counts)
+                        with col_filter2:
+                            show_source = st.selectbox(
+                                "Show Data from:",
+                                options=["Both Files", "OLD File Only", "NEW File Only"]
+                            )
+                        source_filter = {"OLD File Only": "OLD", "NEW File Only": "NEW"}.get(show_source)
+                        # Only the filtered records, distribution and breakdown depend on these
+                        session.set_input("manager", selected_hiring_manager)
+                        session.set_input("source", source_filter)
                     
-                    # For NEW file
-                    if not new_active.empty and "Hiring Manager" in new_active.columns:
-                        new_hm_counts = new_active.groupby("Hiring Manager")["Request ID"].nunique().reset_index()
-                        new_hm_counts.columns = ["Hiring Manager", "Request Count (NEW)"]
-                        hm_stats_data.append(new_hm_counts)
+                        # ---------- HIRING MANAGER STATISTICS ----------
+                        st.write("### 📊 Hiring Manager Statistics")
                     
-                    # Merge statistics
-                    if hm_stats_data:
-                        hm_stats = hm_stats_data[0]
-                        for df in hm_stats_data[1:]:
-                            hm_stats = pd.merge(hm_stats, df, on="Hiring Manager", how="outer")
+                        hm_stats = manager_index.stats
+                        if not hm_stats.empty:
+                            # Display hiring manager statistics
+                            paginated_grid(hm_stats, "grid_hm_stats")
                         
-                        # Fill NaN with 0
-                        hm_stats = hm_stats.fillna(0)
+                            # ---------- FILTERED VIEW ----------
+                            st.write("### 📋 Filtered Records")
                         
-                        # Calculate total requests
-                        count_cols = [col for col in hm_stats.columns if "Request Count" in col]
-                        hm_stats["Total Requests"] = hm_stats[count_cols].sum(axis=1)
+                            filtered_data = session.get("records")
                         
-                        # Sort by total requests (descending)
-                        hm_stats = hm_stats.sort_values("Total Requests", ascending=False)
-                        
-                        # Display hiring manager statistics
-                        st.dataframe(hm_stats, use_container_width=True)
-                        
-                        # ---------- FILTERED VIEW ----------
-                        st.write("### 📋 Filtered Records")
-                        
-                        # Apply filters
-                        filtered_data = final_download_df.copy()
-                        
-                        # Filter by hiring manager
-                        if selected_hiring_manager != "All Hiring Managers":
-                            filtered_data = filtered_data[filtered_data["Hiring Manager"] == selected_hiring_manager]
-                        
-                        # Filter by source
-                        if show_source == "OLD File Only":
-                            filtered_data = filtered_data[filtered_data["Source"] == "OLD"]
-                        elif show_source == "NEW File Only":
-                            filtered_data = filtered_data[filtered_data["Source"] == "NEW"]
-                        
-                        if not filtered_data.empty:
-                            # Show filtered data
-                            st.write(f"**Showing {len(filtered_data)} records for {selected_hiring_manager if selected_hiring_manager != 'All Hiring Managers' else 'all hiring managers'}**")
-                            st.dataframe(filtered_data, use_container_width=True)
+                            if not filtered_data.empty:
+                                # Show filtered data
+                                st.write(f"**Showing {len(filtered_data)} records for {selected_hiring_manager if selected_hiring_manager != ALL_MANAGERS else 'all hiring managers'}**")
+                                paginated_grid(filtered_data, "grid_filtered")
                             
-                            # Show breakdown by status
-                            st.write("**Status Distribution:**")
-                            status_dist = filtered_data.groupby("Status").size().reset_index(name="Count")
-                            status_dist = status_dist.sort_values("Count", ascending=False)
+                                # Show breakdown by status
+                                st.write("**Status Distribution:**")
+                                status_dist = session.get("status_distribution")
                             
-                            col_chart1, col_chart2 = st.columns(2)
+                                col_chart1, col_chart2 = st.columns(2)
                             
-                            with col_chart1:
-                                st.dataframe(status_dist, use_container_width=True)
+                                with col_chart1:
+                                    st.dataframe(status_dist, use_container_width=True)
                             
-                            with col_chart2:
-                                # Create a simple bar chart
-                                if not status_dist.empty:
-                                    fig, ax = plt.subplots()
-                                    bars = ax.bar(status_dist["Status"], status_dist["Count"])
-                                    ax.set_xlabel("Status")
-                                    ax.set_ylabel("Count")
-                                    ax.set_title(f"Requests by Status\n{selected_hiring_manager if selected_hiring_manager != 'All Hiring Managers' else 'All Hiring Managers'}")
-                                    ax.tick_params(axis='x', rotation=45)
-                                    
-                                    # Add count labels on bars
-                                    for bar in bars:
-                                        height = bar.get_height()
-                                        ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                                                f'{int(height)}', ha='center', va='bottom')
-                                    
-                                    st.pyplot(fig)
+                                with col_chart2:
+                                    # Create a simple bar chart
+                                    if not status_dist.empty:
+                                        chart_title = f"Requests by Status\n{selected_hiring_manager if selected_hiring_manager != ALL_MANAGERS else 'All Hiring Managers'}"
+                                        with recorder.stage("status chart"):
+                                            # Rendered once per distinct distribution + title, then served from cache
+                                            if chart_mode == "native":
+                                                st.bar_chart(native_bar_data(status_dist), x="Status", y="Count")
+                                            else:
+                                                st.image(bar_chart_png(status_dist, chart_title))
                             
-                            # Show detailed breakdown by source and status
-                            st.write("**Detailed Breakdown:**")
-                            detailed_stats = filtered_data.groupby(["Source", "Status"]).size().unstack(fill_value=0)
-                            st.dataframe(detailed_stats, use_container_width=True)
+                                # Show detailed breakdown by source and status
+                                st.write("**Detailed Breakdown:**")
+                                detailed_stats = session.get("breakdown")
+                                st.dataframe(detailed_stats, use_container_width=True)
                             
-                            # Download filtered data
-                            st.download_button(
-                                f"⬇️ Download Filtered Data ({len(filtered_data)} records)",
-                                data=to_excel(filtered_data),
-                                file_name=f"filtered_active_statuses_{selected_hiring_manager.lower().replace(' ', '_') if selected_hiring_manager != 'All Hiring Managers' else 'all'}.xlsx",
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                            )
-                        else:
-                            st.info("No records found with the selected filters.")
+                                # Download filtered data
+                                download_button(
+                                    f"⬇️ Download Filtered Data ({len(filtered_data)} records)",
+                                    filtered_data,
+                                    f"filtered_active_statuses_{selected_hiring_manager.lower().replace(' ', '_') if selected_hiring_manager != ALL_MANAGERS else 'all'}",
+                                    export_format,
+                                    recorder=recorder
+                                )
+                            else:
+                                st.info("No records found with the selected filters.")
                     
+                        else:
+                            st.info("No Hiring Manager data available in the files.")
                     else:
-                        st.info("No Hiring Manager data available in the files.")
-                else:
-                    st.warning("⚠️ No Hiring Manager data found in the files.")
-
-            # ---------- DOWNLOAD OPTIONS ----------
-            st.subheader("📥 Download Active Status Records")
-
-            col_dl1, col_dl2, col_dl3 = st.columns(3)
-
-            with col_dl1:
-                # Download COMBINED data (Active statuses from both files)
-                st.download_button(
-                    "⬇️ Download ALL Active Statuses",
-                    data=to_excel(final_download_df),
-                    file_name="active_statuses_from_both_files.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    help="Contains Active, Partially Filled, Zero Filled from BOTH OLD and NEW files"
-                )
-
-            with col_dl2:
-                # Download OLD file active statuses
-                if not old_active.empty:
-                    old_active_download = old_active.copy()
-                    old_active_download["Status"] = old_active_download["Status"].str.title()
-                    st.download_button(
-                        "⬇️ Download OLD File Active",
-                        data=to_excel(old_active_download),
-                        file_name="active_statuses_old_file.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        st.warning("⚠️ No Hiring Manager data found in the files.")
+
+                # ---------- DOWNLOAD OPTIONS ----------
+                st.subheader("📥 Download Active Status Records")
+
+                col_dl1, col_dl2, col_dl3 = st.columns(3)
+
+                with col_dl1:
+                    # Download COMBINED data (Active statuses from both files)
+                    download_button(
+                        "⬇️ Download ALL Active Statuses",
+                        final_download_df,
+                        "active_statuses_from_both_files",
+                        export_format,
+                        recorder=recorder,
+                        help="Contains Active, Partially Filled, Zero Filled from BOTH OLD and NEW files"
                     )
-                else:
-                    st.info("No OLD file data")
 
-            with col_dl3:
-                # Download NEW file active statuses
-                if not new_active.empty:
-                    new_active_download = new_active.copy()
-                    new_active_download["Status"] = new_active_download["Status"].str.title()
-                    st.download_button(
-                        "⬇️ Download NEW File Active",
-                        data=to_excel(new_active_download),
-                        file_name="active_statuses_new_file.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                with col_dl2:
+                    # Download OLD file active statuses
+                    if not old_active.empty:
+                        # Built with its free-text columns on click
+                        download_button(
+                            "⬇️ Download OLD File Active",
+                            lambda: result.old_with_text,
+                            "active_statuses_old_file",
+                            export_format,
+                            recorder=recorder
+                        )
+                    else:
+                        st.info("No OLD file data")
+
+                with col_dl3:
+                    # Download NEW file active statuses
+                    if not new_active.empty:
+                        download_button(
+                            "⬇️ Download NEW File Active",
+                            lambda: result.new_with_text,
+                            "active_statuses_new_file",
+                            export_format,
+                            recorder=recorder
+                        )
+                    else:
+                        st.info("No NEW file data")
+
+                # ---------- ADDITIONAL DOWNLOAD OPTIONS ----------
+                if diff is not None and not diff.empty:
+                    download_button(
+                        "⬇️ Download Comparison View",
+                        diff.view,
+                        "active_status_comparison",
+                        export_format,
+                        recorder=recorder,
+                        help="Side-by-side comparison of OLD vs NEW"
                     )
-                else:
-                    st.info("No NEW file data")
-
-            # ---------- ADDITIONAL DOWNLOAD OPTIONS ----------
-            if 'pivot_df' in locals() and not pivot_df.empty:
-                st.download_button(
-                    "⬇️ Download Comparison View",
-                    data=to_excel(pivot_df),
-                    file_name="active_status_comparison.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    help="Side-by-side comparison of OLD vs NEW"
-                )
 
-            # ---------- STATUS BREAKDOWN ----------
-            st.subheader("📊 Status Distribution")
+                # ---------- STATUS BREAKDOWN ----------
+                st.subheader("📊 Status Distribution")
             
-            if not final_download_df.empty:
-                # Create metrics for each status type
-                status_counts = final_download_df["Status"].value_counts()
+                if not final_download_df.empty:
+                    # Create metrics for each status type
+                    status_counts = final_download_df["Status"].value_counts()
                 
-                cols = st.columns(len(status_counts))
-                for idx, (status, count) in enumerate(status_counts.items()):
-                    with cols[idx]:
-                        if "Active" in status:
-                            st.metric(f"🟢 {status}", count)
-                        elif "Partially" in status:
-                            st.metric(f"🟡 {status}", count)
-                        elif "Zero" in status:
-                            st.metric(f"🔵 {status}", count)
+                    cols = st.columns(len(status_counts))
+                    for idx, (status, count) in enumerate(status_counts.items()):
+                        with cols[idx]:
+                            if "Active" in status:
+                                st.metric(f"🟢 {status}", count)
+                            elif "Partially" in status:
+                                st.metric(f"🟡 {status}", count)
+                            elif "Zero" in status:
+                                st.metric(f"🔵 {status}", count)
                 
-                # Show source breakdown
-                st.write("**Breakdown by File Source:**")
-                source_status = final_download_df.groupby(["Source", "Status"]).size().unstack(fill_value=0)
-                st.dataframe(source_status, use_container_width=True)
+                    # Show source breakdown
+                    st.write("**Breakdown by File Source:**")
+                    source_status = session.get("source_stats")
+                    st.dataframe(source_status, use_container_width=True)
+
+                st.success(f"✅ Extracted {len(final_download_df)} active status records from both files")
+
+                # ---------- DIAGNOSTICS ----------
+                with st.expander("🩺 Diagnostics"):
+                    st.write(f"Job `{job.recorder.run_id}` · {job.recorder.total_seconds:.2f}s across pipeline stages")
+                    st.dataframe(job.recorder.table(), use_container_width=True)
+                    st.write(f"This rerun · {recorder.total_seconds:.2f}s")
+                    st.caption("Only stages recomputed on this rerun are listed; the rest were reused")
+                    st.dataframe(recorder.table(), use_container_width=True)
+                    st.caption(
+                        f"Shared result cache: {len(RESULT_CACHE)} entries · "
+                        f"{RESULT_CACHE.nbytes / 1024 ** 2:.1f} of {RESULT_CACHE.max_bytes / 1024 ** 2:.0f} MB · "
+                        f"{RESULT_CACHE.owners} sessions holding results"
+                    )
 
-            st.success(f"✅ Extracted {len(final_download_df)} active status records from both files")
\ No newline at end of file
+
+# =====================================================
+# TAB 3: MULTI-SNAPSHOT TIMELINE
+# =====================================================
+with tab3:
+    st.subheader("📈 Status & Hiring Manager Timeline Across Snapshots")
+
+    timeline_files = st.file_uploader(
+        "Upload snapshots (ordered by file name; dated names like openings_2026-03-02.xlsx give time in days)",
+        type=["xlsx", "xls", "csv"],
+        accept_multiple_files=True,
+        key="timeline_files"
+    )
+    timeline_stored = st.multiselect(
+        "Add previously loaded snapshots",
+        options=listed_snapshots(SNAPSHOT_STORE),
+        format_func=lambda s: s.describe()
+    )
+
+    timeline_sources = sorted(
+        list(timeline_files or []) + list(timeline_stored),
+        key=lambda f: f.name
+    )
+
+    if len(timeline_sources) >= 2:
+        # Only snapshots added since the last rerun are loaded and diffed
+        try:
+            timeline = extend_timeline(
+                st.session_state.get("timeline"), timeline_sources, store=SNAPSHOT_STORE
+            )
+        except ValueError as exc:
+            st.error(f"❌ {exc}")
+            st.stop()
+        st.session_state["timeline"] = timeline
+
+        history = timeline.history()
+        summary = timeline.request_summary()
+
+        col_t1, col_t2, col_t3 = st.columns(3)
+        with col_t1:
+            st.metric("Snapshots", len(timeline))
+        with col_t2:
+            st.metric("Requests Tracked", len(summary))
+        with col_t3:
+            st.metric("Status Changes", int(history["Status Changed?"].sum()))
+
+        st.write("**Per-Request Summary:**")
+        paginated_grid(summary, "grid_timeline_summary")
+
+        col_tr, col_ts = st.columns(2)
+        with col_tr:
+            st.write("**Status Transitions:**")
+            st.dataframe(timeline.transition_counts(), use_container_width=True)
+        with col_ts:
+            st.write("**Time in Status:**")
+            st.dataframe(timeline.time_in_status(), use_container_width=True)
+
+        st.write("**Change History:**")
+        paginated_grid(history, "grid_timeline_history")
+
+        download_button(
+            "⬇️ Download Change History",
+            history,
+            "request_change_history",
+            export_format
+        )
+    else:
+        st.info("Add at least two snapshots to build a timeline")
@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from compare import build_comparison, diff_snapshots, has_active_status
+from diagnostics import StageRecorder
+from export import serialize
+from loader import eager_columns, read_active, read_columns, read_file
+from main import evolve_extract, generate_extract, write_extract
+from managers import ALL_MANAGERS
+from pipeline import build_final_view, compare_active, normalize_request_id, standardize_status
+
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+# A stage is a regression when it is this much slower than the baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and the slowdown is large enough not to be timer noise
+MIN_REGRESSION_SECONDS = 0.01
+
+# Memory results are stored next to the timings under this suffix
+PEAK_MB = " [peak MB]"
+
+
+def timed(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_size(rows, workdir, formats, repeat, seed, memory=False):
+    rng = np.random.default_rng(seed)
+    old = generate_extract(rows, rng)
+    new = evolve_extract(old, rng)
+
+    paths = {}
+    for fmt in formats:
+        for label, df in [("old", old), ("new", new)]:
+            path = os.path.join(workdir, f"{label}_{rows}.{fmt}")
+            if not os.path.exists(path):
+                write_extract(df, path)
+            paths[(label, fmt)] = path
+
+    results = {}
+
+    def stage(name, func):
+        seconds, value = timed(func, repeat)
+        results[name] = seconds
+        return value
+
+    for fmt in formats:
+        stage(f"read_file ({fmt})", lambda: read_file(paths[("old", fmt)], cache=None))
+        stage(f"read_active ({fmt})", lambda: read_active(
+            paths[("old", fmt)], keep=has_active_status, normalize=True, cache=None
+        ))
+        # As the comparison loads it: free-text columns are left for the OLD/NEW views
+        stage(f"read_active eager columns ({fmt})", lambda: read_active(
+            paths[("old", fmt)], keep=has_active_status, normalize=True, cache=None,
+            usecols=eager_columns(read_columns(paths[("old", fmt)])),
+        ))
+
+    fmt = formats[0]
+    old_active, new_active = (
+        read_active(paths[(label, fmt)], keep=has_active_status, normalize=True, cache=None)
+        for label in ["old", "new"]
+    )
+    old_ids, new_ids = stage("normalize_request_id", lambda: (
+        normalize_request_id(old_active["Request ID"]), normalize_request_id(new_active["Request ID"])
+    ))
+    old_active["Request ID"], new_active["Request ID"] = old_ids, new_ids
+
+    comparison_df = stage("build_comparison", lambda: build_comparison(old_active, new_active))
+    comparison_df["Status"] = stage("standardize_status", lambda: standardize_status(comparison_df["Status"]))
+    # .view is a cached property, so time it together with a fresh diff
+    stage("diff", lambda: diff_snapshots(comparison_df).view)
+    final_df = stage("final_view", lambda: build_final_view(comparison_df))
+    stage("to_excel", lambda: serialize(final_df, "xlsx"))
+
+    if memory:
+        results.update(compare_peaks(old_active, new_active))
+    return results
+
+
+def compare_peaks(old_active, new_active):
+    # Peak memory of the Compare tab's flow: the comparison, every view it
+    # shows or downloads, and the Hiring Manager index
+    recorder = StageRecorder(trace_memory=True)
+    with recorder.stage("compare flow"):
+        result = compare_active(old_active, new_active, recorder=recorder)
+        with recorder.stage("outputs"):
+            result.outputs()
+        with recorder.stage("manager_index"):
+            result.manager_index.records(ALL_MANAGERS)
+    return {metrics.stage + PEAK_MB: metrics.peak_mb for metrics in recorder.stages}
+
+
+# ------------------ Reporting ------------------
+def report(results, baseline, tolerance):
+    regressions = []
+    for size, stages in results.items():
+        print(f"\n{size} rows")
+        for name, seconds in stages.items():
+            unit = "MB" if name.endswith(PEAK_MB) else "s"
+            line = f"  {name:<34}{seconds:>10.3f}{unit}"
+            previous = baseline.get(size, {}).get(name)
+            if previous:
+                change = seconds / previous - 1
+                line += f"  {change:+.0%} vs baseline"
+                if change > tolerance and seconds - previous > MIN_REGRESSION_SECONDS:
+                    line += "  REGRESSION"
+                    regressions.append((size, name, previous, seconds))
+            print(line)
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Time the extract/compare pipeline on synthetic extracts")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Rows per OLD extract")
+    parser.add_argument("--format", nargs="+", default=["csv"], choices=["csv", "xlsx"])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=None, help="Reuse generated extracts from this directory")
+    parser.add_argument("--baseline", default=None, help="JSON results to compare against")
+    parser.add_argument("--save", default=None, help="Write these results as JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--memory", action="store_true",
+                        help="Also record peak memory per Compare stage (tracemalloc; slow)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = args.data_dir or tmpdir
+        os.makedirs(workdir, exist_ok=True)
+        results = {
+            str(rows): run_size(rows, workdir, args.format, args.repeat, args.seed, args.memory)
+            for rows in args.sizes
+        }
+
+    regressions = report(results, baseline, args.tolerance)
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+_MISSING = object()
+
+
+def estimate_nbytes(value):
+    if hasattr(value, "nbytes") and callable(value.nbytes):
+        return int(value.nbytes())
+    if isinstance(value, tuple):
+        return sum(estimate_nbytes(item) for item in value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by an approximate memory budget in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value, nbytes=None):
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        with self._lock:
+            self._discard(key)
+            # Values larger than the whole budget are never kept
+            if nbytes > self.max_bytes:
+                return value
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            self._evict()
+        return value
+
+    def get_or_create(self, key, factory):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        return self.put(key, factory())
+
+    def discard(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def _evict(self):
+        while self._nbytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._nbytes -= entry[1]
+
+
+class QuotaExceeded(MemoryError):
+    """A value an owner asked for would take it, or the shared cache, past its budget."""
+
+
+class SharedCache(LRUCache):
+    """Process-wide LRU cache whose entries are reference-counted by owner.
+
+    Owners are sessions: an entry an owner still holds is never evicted, so
+    concurrent users of the same key share one in-memory copy. Unreferenced
+    entries are evicted least recently used first once `max_bytes` is
+    exceeded. A value that would take its owner past `owner_quota` bytes, or
+    the held entries past `max_bytes`, is turned away with QuotaExceeded
+    rather than evicting anything still in use.
+    """
+
+    def __init__(self, max_bytes, owner_quota):
+        super().__init__(max_bytes)
+        self.owner_quota = owner_quota
+        self._refs = {}     # key -> owners holding it
+        self._owned = {}    # owner -> keys, oldest reference first
+        self._building = {}  # key -> lock held while the value is built
+
+    @property
+    def owners(self):
+        return len(self._owned)
+
+    def refcount(self, key):
+        return len(self._refs.get(key, ()))
+
+    def owned_nbytes(self, owner):
+        with self._lock:
+            return sum(self._entries[key][1] for key in self._owned.get(owner, ()) if key in self._entries)
+
+    def held_nbytes(self):
+        with self._lock:
+            return sum(nbytes for key, (_, nbytes) in self._entries.items() if key in self._refs)
+
+    def acquire(self, owner, key, factory):
+        # Built once even when several sessions ask for the same key at the same time
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        try:
+            with building:
+                with self._lock:
+                    value = self.get(key, _MISSING)
+                    if value is not _MISSING:
+                        # Already in memory, so only this owner's quota applies
+                        self._check_quota(owner, key, self._entries[key][1])
+                        self._pin(owner, key)
+                        return value
+                value = factory()
+                self._insert(owner, key, value)
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+        return value
+
+    def _check_quota(self, owner, key, nbytes, new=False):
+        mb = 1024 * 1024
+        owned = sum(self._entries[k][1] for k in self._owned.get(owner, ()) if k != key and k in self._entries)
+        if owned + nbytes > self.owner_quota:
+            raise QuotaExceeded(
+                f"These results need {(owned + nbytes) / mb:.0f} MB, over the "
+                f"{self.owner_quota / mb:.0f} MB allowed per session"
+            )
+        if new and self.held_nbytes() + nbytes > self.max_bytes:
+            raise QuotaExceeded(
+                f"The shared result cache ({self.max_bytes / mb:.0f} MB) is full with other "
+                "sessions' results; try again once they finish"
+            )
+
+    def _insert(self, owner, key, value):
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            self._check_quota(owner, key, nbytes, new=True)
+            self._discard(key)
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            # Pinned before anything is evicted, so the new entry is never the one evicted
+            self._pin(owner, key)
+
+    def release(self, owner, key=None):
+        # Drops one reference, or all of the owner's when `key` is None
+        with self._lock:
+            keys = list(self._owned.get(owner, ())) if key is None else [key]
+            for k in keys:
+                self._unpin(owner, k)
+            self._evict()
+
+    def _pin(self, owner, key):
+        owned = self._owned.setdefault(owner, [])
+        if key in owned:
+            owned.remove(key)
+        owned.append(key)
+        self._refs.setdefault(key, set()).add(owner)
+        self._evict()
+
+    def _unpin(self, owner, key):
+        owned = self._owned.get(owner, [])
+        if key in owned:
+            owned.remove(key)
+        if not owned:
+            self._owned.pop(owner, None)
+        holders = self._refs.get(key)
+        if holders is not None:
+            holders.discard(owner)
+            if not holders:
+                del self._refs[key]
+
+    def _evict(self):
+        # Referenced entries are never evicted; see _check_quota()
+        for key in list(self._entries):
+            if self._nbytes <= self.max_bytes:
+                break
+            if key not in self._refs:
+                self._discard(key)
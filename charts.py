@@ -0,0 +1,68 @@
+import hashlib
+import os
+from io import BytesIO
+
+import pandas as pd
+
+from cache import LRUCache
+
+
+# "image" renders a PNG server-side with matplotlib; "native" hands the data to the browser
+CHART_MODES = {
+    "image": "Image",
+    "native": "Interactive",
+}
+DEFAULT_CHART_MODE = os.environ.get("CHART_MODE", "image")
+
+# Rendered PNGs, keyed on the aggregated data + title
+CHART_CACHE_BYTES = 32 * 1024 * 1024
+CHART_CACHE = LRUCache(CHART_CACHE_BYTES)
+
+
+def chart_key(dist, title):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(title.encode())
+    digest.update(repr(list(dist.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(dist, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _render_bar_chart(dist, title):
+    # matplotlib is imported on first render, not at app startup. A bare Figure is
+    # not tracked by pyplot, so it is freed as soon as it goes out of scope.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    try:
+        ax = fig.subplots()
+        bars = ax.bar(dist["Status"].astype(str), dist["Count"])
+        ax.set_xlabel("Status")
+        ax.set_ylabel("Count")
+        ax.set_title(title)
+        ax.tick_params(axis="x", rotation=45)
+
+        # Count labels on bars
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width() / 2., height + 0.1,
+                    f"{int(height)}", ha="center", va="bottom")
+
+        output = BytesIO()
+        fig.savefig(output, format="png", bbox_inches="tight")
+        return output.getvalue()
+    finally:
+        fig.clear()
+
+
+def bar_chart_png(dist, title, cache=CHART_CACHE):
+    # dist: Status / Count columns, as from ManagerIndex.status_distribution()
+    if cache is None:
+        return _render_bar_chart(dist, title)
+    return cache.get_or_create(chart_key(dist, title), lambda: _render_bar_chart(dist, title))
+
+
+def native_bar_data(dist):
+    # Plain text statuses, so unused categories don't show up as empty bars
+    return dist.assign(Status=dist["Status"].astype(str))
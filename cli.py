@@ -0,0 +1,159 @@
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from diagnostics import StageRecorder, log_stages
+from export import EXPORT_FORMATS, export_file_name, serialize
+from pipeline import compare_files, extract_active, extract_outputs, unknown_statuses
+
+
+SUPPORTED_SUFFIXES = {".csv", ".xlsx", ".xls"}
+
+
+# ------------------ Input Discovery ------------------
+def expand_inputs(inputs):
+    # Each input may be a file, a directory, or a glob pattern
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(str(p) for p in Path(item).iterdir())
+        elif os.path.exists(item):
+            matches = [item]
+        else:
+            matches = sorted(glob.glob(item, recursive=True))
+        paths.extend(p for p in matches if Path(p).suffix.lower() in SUPPORTED_SUFFIXES)
+    return paths
+
+
+def by_stem(paths):
+    files = {}
+    for path in paths:
+        stem = Path(path).stem
+        if stem in files:
+            raise SystemExit(f"Duplicate input name '{stem}': {files[stem]} and {path}")
+        files[stem] = path
+    return files
+
+
+def pair_inputs(old_inputs, new_inputs):
+    old_files = by_stem(expand_inputs(old_inputs))
+    new_files = by_stem(expand_inputs(new_inputs))
+    if len(old_files) == 1 and len(new_files) == 1 and old_files.keys() != new_files.keys():
+        # A single OLD and NEW file are compared with each other whatever their names
+        (old_stem, old_path), (new_stem, new_path) = *old_files.items(), *new_files.items()
+        return [(f"{old_stem}_vs_{new_stem}", old_path, new_path)], []
+    pairs = [(stem, old_files[stem], new_files[stem]) for stem in sorted(old_files.keys() & new_files.keys())]
+    unmatched = sorted(old_files.keys() ^ new_files.keys())
+    return pairs, unmatched
+
+
+def write_outputs(outputs, out_dir, fmt):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for stem, df in outputs.items():
+        path = out_dir / export_file_name(stem, fmt)
+        path.write_bytes(serialize(df, fmt))
+        written.append(str(path))
+    return written
+
+
+# ------------------ Workers ------------------
+def describe_unknown(*frames):
+    unknown = {}
+    for df in frames:
+        for status, rows in unknown_statuses(df).items():
+            unknown[status] = unknown.get(status, 0) + rows
+    if not unknown:
+        return ""
+    return "; unknown statuses treated as inactive: " + ", ".join(f"{s} ({n})" for s, n in unknown.items())
+
+
+def run_extract(name, path, out_dir, fmt):
+    recorder = StageRecorder(run_id=name)
+    active_df = extract_active(path, cache=None, recorder=recorder)
+    if active_df.empty:
+        return f"{name}: no Active records found"
+    with recorder.stage("export", rows=len(active_df)):
+        write_outputs(extract_outputs(active_df), Path(out_dir) / name, fmt)
+    return f"{name}: {len(active_df)} Active requests extracted" + describe_unknown(active_df)
+
+
+def run_compare(name, old_path, new_path, out_dir, fmt, compact):
+    recorder = StageRecorder(run_id=name)
+    result = compare_files(old_path, new_path, compact=compact, cache=None, recorder=recorder)
+    if result.old_active.empty and result.new_active.empty:
+        return f"{name}: no active status records found in either file"
+    with recorder.stage("export", rows=len(result.final_df)):
+        write_outputs(result.outputs(), Path(out_dir) / name, fmt)
+    summary = f"{name}: {len(result.final_df)} active status records (OLD {len(result.old_active)}, NEW {len(result.new_active)})"
+    if result.diff is not None:
+        counts = ", ".join(f"{change} {count}" for change, count in result.diff.counts().items())
+        summary += f"; {counts}"
+    return summary + describe_unknown(result.old_active, result.new_active)
+
+
+def run_jobs(jobs, workers, log=False):
+    failures = 0
+    initializer = log_stages if log else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        futures = {pool.submit(func, *args): args[0] for func, args in jobs}
+        for future in as_completed(futures):
+            try:
+                print(future.result())
+            except Exception as exc:
+                failures += 1
+                print(f"{futures[future]}: FAILED - {exc}", file=sys.stderr)
+    return failures
+
+
+# ------------------ Entry Point ------------------
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Batch Active Extract and OLD vs NEW comparison without the Streamlit UI"
+    )
+    parser.add_argument("-o", "--out", default="output", help="Output directory (default: output)")
+    parser.add_argument("-f", "--format", default="xlsx", choices=list(EXPORT_FORMATS))
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--log-stages", action="store_true",
+                        help="Log per-stage timings to stderr as JSON lines")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    extract = commands.add_parser("extract", help="Extract Active requests from each file")
+    extract.add_argument("inputs", nargs="+", help="Files, directories or glob patterns")
+
+    compare = commands.add_parser("compare", help="Compare OLD vs NEW files paired by file name (or a single OLD and NEW file)")
+    compare.add_argument("--old", nargs="+", required=True, help="OLD files, directories or glob patterns")
+    compare.add_argument("--new", nargs="+", required=True, help="NEW files, directories or glob patterns")
+    compare.add_argument("--compact", action="store_true", help="Load only the comparison columns")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "extract":
+        jobs = [
+            (run_extract, (name, path, args.out, args.format))
+            for name, path in by_stem(expand_inputs(args.inputs)).items()
+        ]
+    else:
+        pairs, unmatched = pair_inputs(args.old, args.new)
+        for name in unmatched:
+            print(f"{name}: skipped, no matching OLD/NEW file", file=sys.stderr)
+        jobs = [
+            (run_compare, (name, old_path, new_path, args.out, args.format, args.compact))
+            for name, old_path, new_path in pairs
+        ]
+
+    if not jobs:
+        message = "No input files found" if args.command == "extract" else "No OLD/NEW file pairs matched"
+        print(message, file=sys.stderr)
+        return 1
+    return 1 if run_jobs(jobs, args.workers, log=args.log_stages) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
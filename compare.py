@@ -0,0 +1,147 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from normalize import key_codes, lookup, unify_categories
+from statuses import STATUS_CLASSIFIER
+
+
+# Columns carried from each snapshot into the OLD/NEW comparison
+COMPARISON_COLUMNS = [
+    "Request ID",
+    "Status",
+    "Hiring Manager",
+    "Job Title",
+    "Interviewed?",
+    "Work Site Name",
+    "Total Positions",
+]
+
+
+def has_active_status(status):
+    # Statuses marked "active" in statuses.json (Active, Partially Filled, Zero Filled)
+    return STATUS_CLASSIFIER.is_active(status)
+
+
+def project_snapshot(df, source):
+    # Select the comparison columns; ones missing from this extract become ""
+    projected = pd.DataFrame(
+        {col: df[col] if col in df.columns else "" for col in COMPARISON_COLUMNS},
+        index=df.index,
+    )
+    projected.insert(0, "Source", source)
+    return projected
+
+
+def build_comparison(old_active, new_active):
+    parts = [
+        project_snapshot(df, source)
+        for df, source in [(old_active, "OLD"), (new_active, "NEW")]
+        if not df.empty
+    ]
+    if not parts:
+        return pd.DataFrame(columns=["Source"] + COMPARISON_COLUMNS)
+    return pd.concat(unify_categories(parts), ignore_index=True)
+
+
+# ------------------ OLD vs NEW diff ------------------
+DIFF_FIELDS = ["Status", "Hiring Manager"]
+
+ADDED = "Added"
+REMOVED = "Removed"
+STATUS_CHANGED = "Status Changed"
+MANAGER_CHANGED = "Manager Changed"
+UNCHANGED = "Unchanged"
+
+
+def _side(df, codes, suffix, fields):
+    # Indexed by integer key code; rows without an ID can't be matched and are left out
+    side = df.reindex(columns=fields).set_axis(codes)
+    side = side[(codes >= 0) & ~side.index.duplicated()]
+    side.columns = [f"{field} ({suffix})" for field in fields]
+    return side
+
+
+def _present(codes, size):
+    present = np.zeros(size, dtype=bool)
+    present[codes[codes >= 0]] = True
+    return present
+
+
+def _compare_key(values):
+    return values.astype(str).str.strip().str.lower()
+
+
+def _differs(old, new):
+    # Case/whitespace-insensitive; a value missing on either side is not a change
+    old_key = lookup(old, _compare_key)
+    new_key = lookup(new, _compare_key)
+    return (old_key != new_key) & old.notna().to_numpy() & new.notna().to_numpy()
+
+
+class SnapshotDiff:
+    """OLD/NEW snapshots joined once on Request ID, with per-field change masks."""
+
+    def __init__(self, old, new, fields=DIFF_FIELDS):
+        self.fields = list(fields)
+        # Joined on integer codes; codes follow key order, so the result is sorted by Request ID
+        ids, (old_codes, new_codes) = key_codes(old["Request ID"], new["Request ID"])
+        table = _side(old, old_codes, "OLD", self.fields).join(
+            _side(new, new_codes, "NEW", self.fields), how="outer", sort=True
+        )
+        keys = table.index.to_numpy()
+        table.index = pd.Index(ids.take(keys), name="Request ID")
+        self.table = table
+
+        self.in_old = _present(old_codes, len(ids))[keys]
+        self.in_new = _present(new_codes, len(ids))[keys]
+        both = self.in_old & self.in_new
+        self.changed = {
+            field: both & _differs(table[f"{field} (OLD)"], table[f"{field} (NEW)"])
+            for field in self.fields
+        }
+
+        self.change = pd.Series(
+            np.select(
+                [
+                    ~self.in_old,
+                    ~self.in_new,
+                    self.changed.get("Status", np.zeros(len(table), dtype=bool)),
+                    self.changed.get("Hiring Manager", np.zeros(len(table), dtype=bool)),
+                ],
+                [ADDED, REMOVED, STATUS_CHANGED, MANAGER_CHANGED],
+                default=UNCHANGED,
+            ),
+            index=table.index,
+            name="Change",
+        )
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def empty(self):
+        return self.table.empty
+
+    def count(self, change):
+        return int((self.change == change).sum())
+
+    def counts(self):
+        return self.change.value_counts()
+
+    @cached_property
+    def view(self):
+        view = self.table.copy(deep=False)
+        view["Status Changed?"] = np.where(self.changed["Status"], "Yes", "No")
+        if "Hiring Manager" in self.changed:
+            view["Manager Changed?"] = np.where(self.changed["Hiring Manager"], "Yes", "No")
+        view["Change"] = self.change
+        return view.reset_index()
+
+
+def diff_snapshots(comparison_df, fields=DIFF_FIELDS):
+    # Only the key and compared fields are split by source, not every column
+    source = comparison_df["Source"]
+    keyed = comparison_df.reindex(columns=["Request ID", *fields])
+    return SnapshotDiff(keyed[source == "OLD"], keyed[source == "NEW"], fields)
@@ -0,0 +1,138 @@
+import json
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+
+logger = logging.getLogger("pipeline")
+
+MB = 1024 * 1024
+
+
+def log_stages(stream=None, level=logging.INFO):
+    # One JSON object per line, ready for a log shipper; safe to call on every rerun
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+@dataclass
+class StageMetrics:
+    stage: str
+    seconds: float = 0.0
+    peak_mb: float = None
+    rows: int = None
+    depth: int = 0
+
+
+class StageRecorder:
+    """Wall time, peak memory and row counts for each pipeline stage of one run.
+
+    Every finished stage is also logged as one JSON line on the "pipeline" logger.
+    Peak memory needs tracemalloc, which slows allocation-heavy code, so it is
+    only traced when asked for. Stages may run in several threads at once; the
+    peaks of overlapping stages then include each other's allocations.
+    """
+
+    def __init__(self, trace_memory=False, run_id=None):
+        self.trace_memory = trace_memory
+        self.run_id = run_id or uuid.uuid4().hex[:8]
+        self.stages = []
+        self._lock = threading.Lock()
+        self._tracing = 0
+        self._local = threading.local()
+
+    @property
+    def _open(self):
+        # Peak seen so far by each open stage of this thread, innermost last
+        if not hasattr(self._local, "peaks"):
+            self._local.peaks = []
+        return self._local.peaks
+
+    def _start_tracing(self):
+        with self._lock:
+            if self._tracing == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracing = True
+            elif self._tracing == 0:
+                self._owns_tracing = False
+            self._tracing += 1
+
+    def _stop_tracing(self):
+        with self._lock:
+            self._tracing -= 1
+            if self._tracing == 0 and self._owns_tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        # Set `.rows` on the yielded metrics when the count is only known afterwards
+        open_stages = self._open
+        metrics = StageMetrics(name, rows=rows, depth=len(open_stages))
+        # Listed in start order, so a parent comes before its nested stages
+        with self._lock:
+            self.stages.append(metrics)
+        tracing = self.trace_memory
+        if tracing:
+            self._start_tracing()
+            current, peak = tracemalloc.get_traced_memory()
+            if open_stages:
+                open_stages[-1] = max(open_stages[-1], peak)
+            tracemalloc.reset_peak()
+        open_stages.append(0)
+
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.seconds = time.perf_counter() - start
+            peak = open_stages.pop()
+            if tracing:
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                metrics.peak_mb = max(peak - current, 0) / MB
+                if open_stages:
+                    open_stages[-1] = max(open_stages[-1], peak)
+                self._stop_tracing()
+            record = dict(asdict(metrics), seconds=round(metrics.seconds, 4))
+            if metrics.peak_mb is not None:
+                record["peak_mb"] = round(metrics.peak_mb, 2)
+            logger.info(json.dumps({"event": "pipeline_stage", "run": self.run_id, **record}))
+
+    def checkpoint(self):
+        # Called between chunks of long-running work; a no-op unless the run can be cancelled
+        pass
+
+    def wrap(self, name, func):
+        # For work that runs later, e.g. a download serialized on click
+        def timed(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+        return timed
+
+    def table(self):
+        if not self.stages:
+            return pd.DataFrame(columns=["Stage", "Seconds", "Peak MB", "Rows"])
+        table = pd.DataFrame([asdict(m) for m in self.stages])
+        # Nested stages are indented under their parent
+        table["stage"] = ["  " * m.depth + m.stage for m in self.stages]
+        table = table.drop(columns="depth")
+        table.columns = ["Stage", "Seconds", "Peak MB", "Rows"]
+        if not self.trace_memory:
+            table = table.drop(columns="Peak MB")
+        return table
+
+    @property
+    def total_seconds(self):
+        # Nested stages are already counted in their parent
+        return sum(m.seconds for m in self.stages if m.depth == 0)
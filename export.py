@@ -0,0 +1,136 @@
+import hashlib
+import importlib.util
+from io import BytesIO
+
+import pandas as pd
+
+from cache import LRUCache
+
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "xlsx": (".xlsx", XLSX_MIME),
+    "csv": (".csv", "text/csv"),
+}
+if importlib.util.find_spec("pyarrow") is not None:
+    EXPORT_FORMATS["parquet"] = (".parquet", "application/vnd.apache.parquet")
+
+# Rows converted to Python values at a time while writing xlsx
+EXPORT_CHUNK_ROWS = 10_000
+
+# Serialized downloads, keyed on the frame's content hash + format
+EXPORT_CACHE_BYTES = 256 * 1024 * 1024
+EXPORT_CACHE = LRUCache(EXPORT_CACHE_BYTES)
+
+
+def frame_digest(df):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(repr([str(dtype) for dtype in df.dtypes]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _rows(df):
+    header = [str(col) for col in df.columns]
+    yield header
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def _date_only_columns(df):
+    # Positions of datetime columns holding whole days, e.g. Start Date parsed from an extract
+    positions = []
+    for position, (_, values) in enumerate(df.items()):
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dropna()
+            if (values == values.dt.normalize()).all():
+                positions.append(position)
+    return positions
+
+
+def _write_xlsx(df, output):
+    date_only = _date_only_columns(df)
+    if importlib.util.find_spec("xlsxwriter") is not None:
+        import xlsxwriter
+
+        # constant_memory flushes each row to disk as soon as it is written
+        workbook = xlsxwriter.Workbook(
+            output,
+            {
+                "constant_memory": True,
+                "strings_to_urls": False,
+                "strings_to_formulas": False,
+                "default_date_format": "yyyy-mm-dd hh:mm:ss",
+            },
+        )
+        worksheet = workbook.add_worksheet("Sheet1")
+        date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+        for row_idx, row in enumerate(_rows(df)):
+            if not row_idx or not date_only:
+                worksheet.write_row(row_idx, 0, row)
+                continue
+            # Whole days get a date-only format, so 2026-04-15 doesn't show as 00:00:00
+            row = list(row)
+            days = [(col_idx, row[col_idx]) for col_idx in date_only]
+            for col_idx in date_only:
+                row[col_idx] = None
+            worksheet.write_row(row_idx, 0, row)
+            for col_idx, day in days:
+                if day is not None:
+                    worksheet.write_datetime(row_idx, col_idx, day, date_format)
+        workbook.close()
+        return
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Sheet1")
+    for row_idx, row in enumerate(_rows(df)):
+        if row_idx and date_only:
+            # openpyxl formats dates (not datetimes) as yyyy-mm-dd
+            row = list(row)
+            for col_idx in date_only:
+                if row[col_idx] is not None:
+                    row[col_idx] = row[col_idx].date()
+        worksheet.append(row)
+    workbook.save(output)
+
+
+def serialize(df, fmt="xlsx"):
+    output = BytesIO()
+    if fmt == "xlsx":
+        _write_xlsx(df, output)
+    elif fmt == "csv":
+        df.to_csv(output, index=False)
+    elif fmt == "parquet":
+        # Arrow needs one type per column; mixed object columns go out as text
+        mixed = {col: "string" for col in df.columns if df[col].dtype == object}
+        df.astype(mixed).to_parquet(output, index=False)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return output.getvalue()
+
+
+def export_bytes(df, fmt="xlsx", cache=EXPORT_CACHE):
+    if cache is None:
+        return serialize(df, fmt)
+    return cache.get_or_create((frame_digest(df), fmt), lambda: serialize(df, fmt))
+
+
+def lazy_export(df, fmt="xlsx"):
+    # Deferred: nothing is serialized until the download is actually requested.
+    # `df` may also be a function returning the frame, so it is only built then too.
+    return lambda: export_bytes(df() if callable(df) else df, fmt)
+
+
+def export_file_name(stem, fmt):
+    return stem + EXPORT_FORMATS[fmt][0]
+
+
+def export_mime(fmt):
+    return EXPORT_FORMATS[fmt][1]
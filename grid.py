@@ -0,0 +1,84 @@
+import math
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+from normalize import lookup
+
+
+GRID_PAGE_SIZES = [25, 50, 100, 250, 1000]
+
+# Row orders (one int array per search/sort) for the frames currently on screen
+GRID_CACHE = LRUCache(max_bytes=64 * 1024 * 1024)
+
+
+def _contains(values, needle):
+    found = values.astype(str).str.lower().str.contains(needle, regex=False).to_numpy()
+    return found & values.notna().to_numpy()
+
+
+def search_mask(df, query):
+    # Case-insensitive substring match in any column, evaluated once per distinct value
+    needle = query.strip().lower()
+    mask = np.zeros(len(df), dtype=bool)
+    if not needle:
+        return ~mask
+    for col in df.columns:
+        mask |= lookup(df[col], lambda values: _contains(values, needle)).astype(bool)
+    return mask
+
+
+def _sort_rank(series):
+    # Rank of each row's value among the distinct values; missing values get NaN
+    def rank(values):
+        values = values.to_numpy(dtype=object)
+        present = pd.notna(values)
+        try:
+            order = np.argsort(values[present], kind="stable")
+        except TypeError:
+            # Mixed types, e.g. numbers and text in one Excel column
+            order = np.argsort(values[present].astype(str), kind="stable")
+        ranks = np.full(len(values), np.nan)
+        ranks[np.flatnonzero(present)[order]] = np.arange(len(order))
+        return ranks
+    return lookup(series, rank).astype(float)
+
+
+def grid_order(df, query="", sort_by=None, ascending=True, cache=GRID_CACHE):
+    # Positions of the matching rows, in display order
+    def build():
+        positions = np.flatnonzero(search_mask(df, query))
+        if sort_by is not None:
+            rank = _sort_rank(df[sort_by])[positions]
+            rank = np.where(np.isnan(rank), np.inf, rank if ascending else -rank)
+            positions = positions[np.argsort(rank, kind="stable")]
+        return positions
+
+    if cache is None:
+        return build()
+    if not query.strip() and sort_by is None:
+        return np.arange(len(df))
+
+    # Grids are handed the same frame object on every rerun (from the stage pipeline,
+    # session state or the Timeline), so the object identifies the rows; hashing the
+    # content would cost as much as building the order. An entry is dropped once its
+    # frame is gone, and the weak reference also catches an id reused meanwhile.
+    key = (id(df), len(df), query.strip().lower(), sort_by, ascending)
+    ref, positions = cache.get(key, (None, None))
+    if ref is None or ref() is not df:
+        positions = build()
+        ref = weakref.ref(df, lambda _, key=key: cache.discard(key))
+        cache.put(key, (ref, positions), nbytes=positions.nbytes)
+    return positions
+
+
+def page_count(rows, page_size):
+    return max(1, math.ceil(rows / page_size))
+
+
+def page_rows(df, positions, page, page_size):
+    # `page` is 1-based
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from diagnostics import StageRecorder
+
+
+# Worker threads for background comparisons, shared by every session
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+# Finished jobs stay attachable (e.g. after a browser refresh) for this long
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_MINUTES", 60)) * 60
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Progress phases, matched against the start of each stage name
+PHASES = [
+    ("Parsing", ("read_active", "snapshot store load")),
+    ("Normalizing", ("normalize_request_id", "snapshot store save", "build_comparison", "standardize_status")),
+    ("Diffing", ("diff", "final_view", "manager_index")),
+]
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def phase_of(stage):
+    for index, (phase, prefixes) in enumerate(PHASES):
+        if stage.startswith(prefixes):
+            return index, phase
+    return None, None
+
+
+class JobRecorder(StageRecorder):
+    """StageRecorder that reports progress to its job and stops the run once cancelled."""
+
+    def __init__(self, job, trace_memory=False):
+        super().__init__(trace_memory=trace_memory, run_id=job.id[:8])
+        self.job = job
+
+    def checkpoint(self):
+        if self.job.cancel_requested.is_set():
+            raise JobCancelled()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        self.checkpoint()
+        self.job.enter(name)
+        with super().stage(name, rows) as metrics:
+            yield metrics
+        self.checkpoint()
+
+
+class Job:
+    """One background run: its state, current phase and progress, and its result."""
+
+    def __init__(self, func, trace_memory=False, **context):
+        self.id = uuid.uuid4().hex
+        self.func = func
+        # Caller-owned details kept with the job, e.g. which inputs it compares
+        self.context = context
+        self.state = QUEUED
+        self.phase = None
+        self.stage = None
+        self.progress = 0.0
+        self.messages = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.cancel_requested = threading.Event()
+        self.recorder = JobRecorder(self, trace_memory=trace_memory)
+        self._future = None
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED, CANCELLED)
+
+    def enter(self, stage):
+        index, phase = phase_of(stage)
+        self.stage = stage
+        if phase is not None:
+            self.phase = phase
+            self.progress = max(self.progress, index / len(PHASES))
+
+    def report(self, message):
+        self.messages.append(message)
+
+    def cancel(self):
+        # Queued jobs never start; running ones stop at their next checkpoint
+        self.cancel_requested.set()
+        if self._future is not None and self._future.cancel():
+            self._finish(CANCELLED)
+
+    def run(self):
+        if self.cancel_requested.is_set():
+            return self._finish(CANCELLED)
+        self.state = RUNNING
+        try:
+            self.result = self.func(self)
+        except JobCancelled:
+            self._finish(CANCELLED)
+        except Exception as exc:
+            self.error = exc
+            self._finish(FAILED)
+        else:
+            self.progress = 1.0
+            self._finish(DONE)
+
+    def _finish(self, state):
+        # The function may hold the job's inputs, e.g. uploads; finished jobs are kept a while
+        self.func = None
+        self.state = state
+        self.finished_at = time.time()
+
+
+class JobManager:
+    """Process-wide pool of background jobs, looked up by id from any session."""
+
+    def __init__(self, workers=JOB_WORKERS, retention=JOB_RETENTION_SECONDS):
+        self.retention = retention
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func, trace_memory=False, **context):
+        # `func(job)` does the work; it reports through job.recorder and job.report()
+        job = Job(func, trace_memory=trace_memory, **context)
+        with self._lock:
+            self._expire()
+            self._jobs[job.id] = job
+        job._future = self._pool.submit(job.run)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def _expire(self):
+        # Dropping a finished job releases its result (and any shared cache references)
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at > self.retention:
+                del self._jobs[job_id]
+
+
+JOBS = JobManager()
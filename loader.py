@@ -0,0 +1,287 @@
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+from normalize import canonical_status, lookup, normalize_frame, remove_unused_categories, unify_categories
+from schemas import EXTRACT_SCHEMAS
+from statuses import status_counts
+
+
+# Cached frames are handed out as shallow copies; copy-on-write (always on from
+# pandas 3) keeps a caller's column writes from reaching the cached data
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Parsed uploads are kept across Streamlit reruns, keyed on content + options
+PARSE_CACHE_BYTES = 512 * 1024 * 1024
+PARSE_CACHE = LRUCache(PARSE_CACHE_BYTES)
+
+# Rows per chunk when streaming CSV extracts
+STREAM_CHUNK_ROWS = 100_000
+
+# Worker processes for parsing the sheets of one workbook; openpyxl holds the GIL, so
+# workbooks parsed in-process (e.g. OLD and NEW loaded side by side) take turns.
+# Starting them costs about a second, so small workbooks are parsed in-process; 0
+# parses every workbook in-process.
+SHEET_WORKERS = int(os.environ.get("SHEET_WORKERS", os.cpu_count() or 1))
+PARALLEL_SHEETS_MIN_BYTES = 8 * 1024 * 1024
+# Seconds between cancellation checks while waiting on worker processes
+CHECKPOINT_SECONDS = 0.5
+
+
+def file_name(file):
+    return getattr(file, "name", None) or os.fspath(file)
+
+
+def file_size(file):
+    return len(file.getvalue()) if hasattr(file, "getvalue") else os.path.getsize(file)
+
+
+def file_digest(file):
+    digest = hashlib.blake2b(digest_size=16)
+    if hasattr(file, "getvalue"):
+        digest.update(file.getvalue())
+    else:
+        with open(file, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def open_source(file):
+    # Uploads are already in memory; paths on disk are read by pandas directly
+    if hasattr(file, "getvalue"):
+        return BytesIO(file.getvalue())
+    return file
+
+
+def is_csv(name):
+    return name.lower().endswith(".csv")
+
+
+def parse(file, **options):
+    source = open_source(file)
+    if is_csv(file_name(file)):
+        return pd.read_csv(source, **options)
+    return pd.read_excel(source, engine="openpyxl", **options)
+
+
+def parse_key(file, options):
+    fmt = "csv" if is_csv(file_name(file)) else "excel"
+    return (file_digest(file), fmt, tuple(sorted((k, repr(v)) for k, v in options.items())))
+
+
+def read_columns(file):
+    return list(parse(file, nrows=0).columns)
+
+
+# ------------------ Known Layouts ------------------
+def schema_of(file):
+    return EXTRACT_SCHEMAS.match(read_columns(file))
+
+
+def read_hints(file, usecols=None):
+    # Explicit dtypes and date parsing for the columns read from a known layout
+    schema = schema_of(file)
+    return {} if schema is None else schema.read_options(usecols)
+
+
+def with_hints(read, file, usecols=None):
+    # `read(hints)` parses the file; a file the hints don't fit is parsed with inferred dtypes
+    hints = read_hints(file, usecols)
+    if hints:
+        try:
+            return read(hints)
+        except (ValueError, TypeError):
+            # e.g. a date column that isn't in the layout's date format
+            pass
+    return read({})
+
+
+def eager_columns(columns):
+    # A known layout's columns minus its free-text ones, in header order; None (every
+    # column) for other headers. The free-text columns are read when a view needs them.
+    schema = EXTRACT_SCHEMAS.match(columns)
+    return None if schema is None else [col for col in columns if col in schema.eager_columns]
+
+
+def read_file(file, cache=PARSE_CACHE, **options):
+    def load():
+        if "dtype" in options or "parse_dates" in options:
+            return parse(file, **options)
+        return with_hints(lambda hints: parse(file, **options, **hints), file, options.get("usecols"))
+
+    if cache is None:
+        return load()
+    df = cache.get_or_create(parse_key(file, options), load)
+    # Callers normalize columns in place; never hand out the cached frame itself
+    return df.copy(deep=False)
+
+
+def extract_sheets(file):
+    # Extracts too big for one sheet continue on further sheets with the same header;
+    # sheets with any other header (summaries, notes) are not part of the extract
+    if is_csv(file_name(file)):
+        return [0]
+    with pd.ExcelFile(open_source(file), engine="openpyxl") as workbook:
+        header = list(workbook.parse(0, nrows=0).columns)
+        return [0] + [
+            sheet for sheet in workbook.sheet_names[1:]
+            if list(workbook.parse(sheet, nrows=0).columns) == header
+        ]
+
+
+# ------------------ Streaming Active Extract ------------------
+def is_active(status):
+    # `status` holds canonical names from statuses.json
+    return status == "Active"
+
+
+def any_status(status):
+    # Keeps every row, e.g. for timelines that follow requests into inactive statuses
+    return np.ones(len(status), dtype=bool)
+
+
+def _keep_rows(df, keep, normalize):
+    # Status is canonicalized and tested once per distinct value, not per row.
+    # Also returns the rows per status before filtering, for the unknown-status report.
+    if normalize:
+        normalize_frame(df)
+        mask = lookup(df["Status"], keep)
+    else:
+        mask = lookup(df["Status"], lambda values: keep(canonical_status(values)))
+    return df[mask], status_counts(df["Status"])
+
+
+def _with_status_counts(df, counts):
+    # Carried in attrs so it survives the parse cache and the snapshot store
+    counts = pd.concat(counts).groupby(level=0).sum() if counts else pd.Series(dtype="int64")
+    df.attrs["status_counts"] = {str(status): int(rows) for status, rows in counts.items()}
+    return df
+
+
+def _sheet_rows(source, sheet, keep, normalize, usecols, hints):
+    # Returns the kept rows, the sheet's full length and its status counts; picklable for worker processes
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    df = pd.read_excel(source, sheet_name=sheet, engine="openpyxl", usecols=usecols, **hints)
+    kept, counts = _keep_rows(df, keep, normalize)
+    return kept, len(df), counts
+
+
+def _no_checkpoint():
+    pass
+
+
+def _parse_sheets(file, sheets, keep, normalize, usecols, hints, checkpoint=_no_checkpoint):
+    results = []
+    with pd.ExcelFile(open_source(file), engine="openpyxl") as workbook:
+        for sheet in sheets:
+            checkpoint()
+            results.append(_sheet_rows(workbook, sheet, keep, normalize, usecols, hints))
+    return results
+
+
+def _parse_sheets_in_pool(payload, sheets, keep, normalize, usecols, hints, workers, checkpoint):
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(sheets)),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    try:
+        futures = [
+            pool.submit(_sheet_rows, payload, sheet, keep, normalize, usecols, hints)
+            for sheet in sheets
+        ]
+        pending = set(futures)
+        while pending:
+            checkpoint()
+            _, pending = wait(pending, timeout=CHECKPOINT_SECONDS, return_when=FIRST_COMPLETED)
+        results = [future.result() for future in futures]
+    except BaseException:
+        # e.g. a cancelled job: return without waiting for the other sheets
+        pool.shutdown(wait=False, cancel_futures=True)
+        if hasattr(pool, "terminate_workers"):
+            pool.terminate_workers()
+        raise
+    pool.shutdown()
+    return results
+
+
+def _excel_rows(file, keep, normalize, usecols, hints, workers, checkpoint=_no_checkpoint):
+    # A sheet parsed in this process can't be interrupted: cancellation takes effect
+    # between sheets, so a small single-sheet workbook is only cancellable before it starts
+    sheets = extract_sheets(file)
+    if workers < 1 or file_size(file) < PARALLEL_SHEETS_MIN_BYTES:
+        results = _parse_sheets(file, sheets, keep, normalize, usecols, hints, checkpoint)
+    else:
+        # Each worker process parses one sheet from its own copy of the workbook; even a
+        # single sheet is parsed out of process, so it doesn't hold this process's GIL
+        payload = file.getvalue() if hasattr(file, "getvalue") else file
+        try:
+            results = _parse_sheets_in_pool(payload, sheets, keep, normalize, usecols, hints, workers, checkpoint)
+        except BrokenProcessPool:
+            # e.g. workers cannot start in this environment; parse here instead
+            results = _parse_sheets(file, sheets, keep, normalize, usecols, hints, checkpoint)
+
+    # Row labels continue across sheets, as if the extract were one long sheet
+    parts, offset = [], 0
+    for part, rows, _ in results:
+        parts.append(part.set_axis(part.index + offset))
+        offset += rows
+    if len(parts) > 1:
+        parts = unify_categories([part for part in parts if not part.empty] or parts[:1])
+    active = remove_unused_categories(pd.concat(parts))
+    return _with_status_counts(active, [counts for _, _, counts in results])
+
+
+def _stream_rows(file, keep, normalize, usecols, chunksize, workers=SHEET_WORKERS,
+                 checkpoint=_no_checkpoint):
+    # `checkpoint` is called between chunks and sheets; it raises to abandon the read
+    return with_hints(
+        lambda hints: _filter_rows(file, keep, normalize, usecols, hints, chunksize, workers, checkpoint),
+        file, usecols,
+    )
+
+
+def _filter_rows(file, keep, normalize, usecols, hints, chunksize, workers, checkpoint):
+    if not is_csv(file_name(file)):
+        # openpyxl has no chunked reader; filter each parsed sheet instead
+        return _excel_rows(file, keep, normalize, usecols, hints, workers, checkpoint)
+
+    # Chunks keep their running row labels, so the result matches a full read
+    reader = pd.read_csv(open_source(file), usecols=usecols, chunksize=chunksize, **hints)
+    results = []
+    with reader:
+        for chunk in reader:
+            checkpoint()
+            results.append(_keep_rows(chunk, keep, normalize))
+    if not results:
+        return _with_status_counts(parse(file, usecols=usecols, nrows=0), [])
+    parts = unify_categories([part for part, _ in results if not part.empty] or [results[0][0]])
+    active = remove_unused_categories(pd.concat(parts))
+    return _with_status_counts(active, [counts for _, counts in results])
+
+
+def read_active(file, keep=is_active, normalize=False, usecols=None,
+                chunksize=STREAM_CHUNK_ROWS, cache=PARSE_CACHE, checkpoint=_no_checkpoint):
+    # Only rows whose normalized Status passes `keep` are ever held in memory
+    if cache is None:
+        return _stream_rows(file, keep, normalize, usecols, chunksize, checkpoint=checkpoint)
+
+    options = {
+        "keep": f"{keep.__module__}.{keep.__qualname__}",
+        "normalize": normalize,
+        "usecols": usecols,
+    }
+    df = cache.get_or_create(
+        parse_key(file, options),
+        lambda: _stream_rows(file, keep, normalize, usecols, chunksize, checkpoint=checkpoint),
+    )
+    return df.copy(deep=False)
@@ -1,49 +1,167 @@
+import argparse
+import os
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-import random
-
-# Create the data (100 records)
-num_records = 100
-
-# Generate sample data
-data = {
-    'Request ID': [f'REQ{1000 + i}' for i in range(1, num_records + 1)],
-    'Status': random.choices(['Active', 'Closed', 'On Hold', 'Cancelled','partially filled','zero filled'], 
-                            weights=[40, 35, 15, 10, 5, 5], k=num_records),
-    'Job Title': random.choices([
-        'Software Engineer', 'Data Analyst', 'Project Manager', 'UX Designer',
-        'DevOps Engineer', 'Product Manager', 'Marketing Specialist',
-        'Sales Representative', 'HR Coordinator', 'Financial Analyst',
-        'Business Analyst', 'Network Administrator', 'QA Tester',
-        'Technical Writer', 'System Administrator'
-    ], k=num_records),
-    'Start Date': [(datetime.now() + timedelta(days=random.randint(-30, 90))).strftime('%Y-%m-%d') 
-                   for _ in range(num_records)],
-    'End Date': [(datetime.now() + timedelta(days=random.randint(30, 180))).strftime('%Y-%m-%d') 
-                 for _ in range(num_records)],
-    'Work Site Address': [f'{random.randint(100, 999)} {random.choice(["Main St", "Oak Ave", "Pine Rd", "Elm St", "Maple Dr", "Cedar Ln"])}, {random.choice(["New York", "San Francisco", "Chicago", "Austin", "Boston", "Seattle", "Denver", "Atlanta"])}, USA' 
-                         for _ in range(num_records)],
-    'Work Site Name': random.choices([
-        'TechCorp Solutions', 'Innovate Inc', 'Global Systems Ltd',
-        'Future Tech', 'Digital Innovations', 'Cloud Solutions Corp',
-        'Data Systems Inc', 'Creative Minds LLC'
-    ], k=num_records),
-    'Total Positions': [random.randint(1, 10) for _ in range(num_records)],
-    'Description': ['Sample job description' for _ in range(num_records)],
-    'Max Submissions per Vending Status': [random.randint(1, 5) for _ in range(num_records)],
-    'Full Name': random.choices([
-        'John Smith', 'Emma Johnson', 'Michael Brown', 'Sarah Davis',
-        'Robert Wilson', 'Jennifer Lee', 'David Miller', 'Lisa Taylor',
-        'James Anderson', 'Maria Garcia'
-    ], k=num_records),
-    'Interviewed?': random.choices(['Yes', 'No', 'Scheduled'], weights=[30, 50, 20], k=num_records),
-    'Hiring Manager': random.choices([
-        'Alice Green', 'Bob White', 'Charlie Black', 'Diana Gray'], k=num_records)
-}
-
-# Create DataFrame
-df = pd.DataFrame(data)
-
-# Save to CSV
-df.to_csv('hiringman_with_diff_status.csv', index=False)
-print("File saved as 'job_openings_dummy.csv'")
\ No newline at end of file
+
+from export import serialize
+
+
+STATUSES = ['Active', 'Closed', 'On Hold', 'Cancelled', 'partially filled', 'zero filled']
+STATUS_WEIGHTS = [40, 35, 15, 10, 5, 5]
+
+JOB_TITLES = [
+    'Software Engineer', 'Data Analyst', 'Project Manager', 'UX Designer',
+    'DevOps Engineer', 'Product Manager', 'Marketing Specialist',
+    'Sales Representative', 'HR Coordinator', 'Financial Analyst',
+    'Business Analyst', 'Network Administrator', 'QA Tester',
+    'Technical Writer', 'System Administrator'
+]
+STREETS = ["Main St", "Oak Ave", "Pine Rd", "Elm St", "Maple Dr", "Cedar Ln"]
+CITIES = ["New York", "San Francisco", "Chicago", "Austin", "Boston", "Seattle", "Denver", "Atlanta"]
+WORK_SITES = [
+    'TechCorp Solutions', 'Innovate Inc', 'Global Systems Ltd',
+    'Future Tech', 'Digital Innovations', 'Cloud Solutions Corp',
+    'Data Systems Inc', 'Creative Minds LLC'
+]
+FULL_NAMES = [
+    'John Smith', 'Emma Johnson', 'Michael Brown', 'Sarah Davis',
+    'Robert Wilson', 'Jennifer Lee', 'David Miller', 'Lisa Taylor',
+    'James Anderson', 'Maria Garcia'
+]
+INTERVIEWED = ['Yes', 'No', 'Scheduled']
+INTERVIEWED_WEIGHTS = [30, 50, 20]
+HIRING_MANAGERS = ['Alice Green', 'Bob White', 'Charlie Black', 'Diana Gray']
+
+# Excel's sheet limit, header row included
+XLSX_MAX_ROWS = 1_048_575
+
+
+def hiring_managers(count):
+    if count <= len(HIRING_MANAGERS):
+        return HIRING_MANAGERS[:count]
+    extra = [f'Manager {i:04d}' for i in range(1, count - len(HIRING_MANAGERS) + 1)]
+    return HIRING_MANAGERS + extra
+
+
+def _choice(rng, options, size, weights=None):
+    p = None if weights is None else np.asarray(weights) / np.sum(weights)
+    return np.asarray(options, dtype=object)[rng.choice(len(options), size=size, p=p)]
+
+
+def _dates(rng, size, low, high):
+    days = pd.to_timedelta(rng.integers(low, high + 1, size=size), unit="D")
+    return (pd.Timestamp(datetime.now()).normalize() + days).strftime('%Y-%m-%d')
+
+
+def generate_extract(num_records, rng=None, first_id=1001, managers=len(HIRING_MANAGERS)):
+    rng = np.random.default_rng() if rng is None else rng
+    ids = np.arange(first_id, first_id + num_records)
+    street_numbers = pd.Series(rng.integers(100, 1000, size=num_records)).astype(str)
+
+    return pd.DataFrame({
+        'Request ID': 'REQ' + pd.Series(ids).astype(str),
+        'Status': _choice(rng, STATUSES, num_records, STATUS_WEIGHTS),
+        'Job Title': _choice(rng, JOB_TITLES, num_records),
+        'Start Date': _dates(rng, num_records, -30, 90),
+        'End Date': _dates(rng, num_records, 30, 180),
+        'Work Site Address': (
+            street_numbers + ' ' + _choice(rng, STREETS, num_records)
+            + ', ' + _choice(rng, CITIES, num_records) + ', USA'
+        ),
+        'Work Site Name': _choice(rng, WORK_SITES, num_records),
+        'Total Positions': rng.integers(1, 11, size=num_records),
+        'Description': 'Sample job description',
+        'Max Submissions per Vending Status': rng.integers(1, 6, size=num_records),
+        'Full Name': _choice(rng, FULL_NAMES, num_records),
+        'Interviewed?': _choice(rng, INTERVIEWED, num_records, INTERVIEWED_WEIGHTS),
+        'Hiring Manager': _choice(rng, hiring_managers(managers), num_records),
+    })
+
+
+def _reassign(rng, values, options, mask):
+    # Move the selected rows to a different option (never the one they already have)
+    options = np.asarray(options, dtype=object)
+    codes = pd.Index(options).get_indexer(values[mask])
+    codes = np.where(codes < 0, 0, codes)
+    shifted = (codes + rng.integers(1, len(options), size=len(codes))) % len(options)
+    values = values.copy()
+    values[mask] = options[shifted]
+    return values
+
+
+def evolve_extract(old, rng=None, status_churn=0.1, manager_churn=0.05,
+                   added=0.05, removed=0.05, managers=len(HIRING_MANAGERS)):
+    # NEW snapshot derived from OLD with controlled churn rates (fractions of OLD rows)
+    rng = np.random.default_rng() if rng is None else rng
+    new = old[rng.random(len(old)) >= removed].reset_index(drop=True)
+
+    status_mask = rng.random(len(new)) < status_churn
+    new['Status'] = _reassign(rng, new['Status'].to_numpy(dtype=object), STATUSES, status_mask)
+    manager_mask = rng.random(len(new)) < manager_churn
+    new['Hiring Manager'] = _reassign(
+        rng, new['Hiring Manager'].to_numpy(dtype=object), hiring_managers(managers), manager_mask
+    )
+
+    last_id = int(old['Request ID'].str[3:].astype(int).max()) if len(old) else 1000
+    extra = generate_extract(int(len(old) * added), rng, first_id=last_id + 1, managers=managers)
+    return pd.concat([new, extra], ignore_index=True)
+
+
+def write_extract(df, path):
+    if path.lower().endswith(".xlsx"):
+        if len(df) > XLSX_MAX_ROWS:
+            raise ValueError(f"{len(df)} rows exceed Excel's {XLSX_MAX_ROWS} row limit; use CSV")
+        with open(path, "wb") as fh:
+            fh.write(serialize(df, "xlsx"))
+    else:
+        df.to_csv(path, index=False)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate synthetic job-opening extracts")
+    parser.add_argument("--rows", type=int, default=100, help="Records per extract (default: 100)")
+    parser.add_argument("--output", default="hiringman_with_diff_status.csv",
+                        help="Output file for a single extract")
+    parser.add_argument("--pair", action="store_true",
+                        help="Write an OLD/NEW pair to --out-dir instead of a single extract")
+    parser.add_argument("--out-dir", default=".", help="Directory for --pair output")
+    parser.add_argument("--format", nargs="+", default=["csv"], choices=["csv", "xlsx"])
+    parser.add_argument("--managers", type=int, default=len(HIRING_MANAGERS), help="Distinct hiring managers")
+    parser.add_argument("--status-churn", type=float, default=0.1, help="Share of rows whose Status changes")
+    parser.add_argument("--manager-churn", type=float, default=0.05, help="Share of rows reassigned to another manager")
+    parser.add_argument("--added", type=float, default=0.05, help="New Request IDs, as a share of OLD rows")
+    parser.add_argument("--removed", type=float, default=0.05, help="Share of OLD Request IDs dropped")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    old = generate_extract(args.rows, rng, managers=args.managers)
+
+    if not args.pair:
+        write_extract(old, args.output)
+        print(f"File saved as '{args.output}'")
+        return
+
+    new = evolve_extract(
+        old, rng,
+        status_churn=args.status_churn,
+        manager_churn=args.manager_churn,
+        added=args.added,
+        removed=args.removed,
+        managers=args.managers,
+    )
+    os.makedirs(args.out_dir, exist_ok=True)
+    for fmt in args.format:
+        for label, df in [("old", old), ("new", new)]:
+            path = os.path.join(args.out_dir, f"{label}_{args.rows}.{fmt}")
+            write_extract(df, path)
+            print(f"File saved as '{path}' ({len(df)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from normalize import key_codes
+
+
+ALL_MANAGERS = "All Hiring Managers"
+INVALID_MANAGERS = {"", "nan", "None", "null"}
+
+
+class ManagerIndex:
+    """Hiring Manager aggregates over one comparison result, built once and served by lookup."""
+
+    def __init__(self, final_df):
+        self.df = final_df
+        if "Hiring Manager" not in final_df.columns:
+            final_df = final_df.assign(**{"Hiring Manager": ""})
+
+        # (Hiring Manager, Source, Status) -> row count
+        self.counts = final_df.groupby(
+            ["Hiring Manager", "Source", "Status"], observed=True
+        ).size()
+        self._all_counts = final_df.groupby(["Source", "Status"], observed=True).size()
+
+        # (Hiring Manager, Source) / Source -> row positions, in final_df order
+        self._positions = final_df.groupby(["Hiring Manager", "Source"], observed=True).indices
+        self._source_positions = final_df.groupby("Source", observed=True).indices
+
+        managers = self.counts.index.get_level_values("Hiring Manager").unique()
+        self.managers = sorted(str(m) for m in managers if str(m) not in INVALID_MANAGERS)
+        self.stats = self._request_counts(final_df)
+
+    def _request_counts(self, final_df):
+        # Deduplicated on integer Request ID codes rather than the strings
+        _, (request_keys,) = key_codes(final_df["Request ID"])
+        requests = final_df[["Hiring Manager", "Source"]].assign(**{"Request ID": request_keys})
+        requests = requests.drop_duplicates()
+        counts = requests.groupby(["Hiring Manager", "Source"], observed=True).size().unstack(fill_value=0)
+        counts = counts[[source for source in ["OLD", "NEW"] if source in counts.columns]]
+        counts.columns = [f"Request Count ({source})" for source in counts.columns]
+        counts = counts[counts.index.astype(str).isin(self.managers)]
+        counts["Total Requests"] = counts.sum(axis=1)
+        counts.index = counts.index.astype(str)
+        counts = counts.rename_axis("Hiring Manager").sort_index()
+        return counts.sort_values("Total Requests", ascending=False, kind="stable").reset_index()
+
+    def _sources(self, source):
+        return ["OLD", "NEW"] if source is None else [source]
+
+    def records(self, manager=ALL_MANAGERS, source=None):
+        if manager == ALL_MANAGERS:
+            keys = [self._source_positions.get(s) for s in self._sources(source)]
+        else:
+            keys = [self._positions.get((manager, s)) for s in self._sources(source)]
+        positions = [p for p in keys if p is not None]
+        if not positions:
+            return self.df.iloc[:0]
+        if sum(len(p) for p in positions) == len(self.df):
+            # Every row matches: hand out the frame itself rather than a gathered copy
+            return self.df
+        return self.df.iloc[np.sort(np.concatenate(positions))]
+
+    def _counts(self, manager, source):
+        counts = self._all_counts if manager == ALL_MANAGERS else self.counts.get(manager)
+        if counts is None or counts.empty:
+            return pd.Series(dtype="int64")
+        return counts[counts.index.get_level_values("Source").isin(self._sources(source))]
+
+    def status_distribution(self, manager=ALL_MANAGERS, source=None):
+        counts = self._counts(manager, source)
+        if counts.empty:
+            return pd.DataFrame(columns=["Status", "Count"])
+        dist = counts.groupby(level="Status", observed=True).sum().rename("Count").reset_index()
+        return dist.sort_values("Count", ascending=False, kind="stable", ignore_index=True)
+
+    def breakdown(self, manager=ALL_MANAGERS, source=None):
+        # Same table as pipeline.status_breakdown() on the filtered records
+        counts = self._counts(manager, source)
+        if counts.empty:
+            return pd.DataFrame()
+        breakdown = counts.unstack(fill_value=0)
+        breakdown.columns = breakdown.columns.astype(str)
+        return breakdown
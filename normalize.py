@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from statuses import STATUS_CLASSIFIER
+
+
+# Low-cardinality text columns held as categoricals once loaded
+CATEGORICAL_COLUMNS = ["Status", "Hiring Manager", "Job Title", "Work Site Name", "Interviewed?"]
+
+
+def is_categorical(series):
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def as_category(series):
+    return series if is_categorical(series) else series.astype("category")
+
+
+def _distinct_values(cat):
+    # Categories plus a trailing NaN slot, so code -1 (missing) maps to the last entry
+    return pd.Series(cat.cat.categories.astype(object).append(pd.Index([np.nan], dtype=object)))
+
+
+def lookup(series, func):
+    # Evaluate `func` once per distinct value and broadcast the result to every row
+    cat = as_category(series)
+    values = np.asarray(func(_distinct_values(cat)))
+    return values[cat.cat.codes.to_numpy()]
+
+
+def recode(series, func):
+    # Rewrite the distinct values with `func`; values that collide are merged
+    cat = as_category(series)
+    values = pd.Index(func(_distinct_values(cat)))
+    categories = values.dropna().unique()
+    new_codes = categories.get_indexer(values)
+    codes = new_codes[cat.cat.codes.to_numpy()]
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=categories),
+        index=series.index,
+        name=series.name,
+    )
+
+
+# ------------------ Value Canonicalization ------------------
+def canonical_status(values):
+    # Configured name for every known spelling (see statuses.json)
+    return STATUS_CLASSIFIER.canonical(values)
+
+
+def strip_text(values):
+    return values.astype(str).str.strip().where(values.notna())
+
+
+def request_id_text(values):
+    # The ID format is inferred once for the whole column
+    if pd.api.types.is_integer_dtype(values) or (
+        pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all()
+    ):
+        # Numeric IDs; Excel hands them over as floats (1001 -> 1001.0)
+        return values.astype("Int64").astype(str).where(values.notna())
+    # Mixed or text IDs: only a whole-number ".0" suffix is dropped, so IDs
+    # such as "REQ10.05" are kept as written
+    text = strip_text(values)
+    return text.str.replace(r"^(\d+)\.0+$", r"\1", regex=True)
+
+
+def key_codes(*keys):
+    # One integer code per distinct key across every series, numbered in key order,
+    # so joins, dedups and sorts can run on the codes. Missing keys are -1.
+    codes, uniques = pd.factorize(pd.concat(keys, ignore_index=True), sort=True)
+    return uniques, np.split(codes, np.cumsum([len(k) for k in keys])[:-1])
+
+
+def normalize_frame(df, columns=CATEGORICAL_COLUMNS):
+    for col in columns:
+        if col in df.columns:
+            df[col] = recode(df[col], canonical_status if col == "Status" else strip_text)
+    return df
+
+
+def remove_unused_categories(df):
+    for col in df.columns:
+        if is_categorical(df[col]):
+            df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+def unify_categories(frames):
+    # pd.concat keeps the category dtype only when categories match exactly
+    columns = {col for df in frames for col in df.columns if is_categorical(df[col])}
+    for col in columns:
+        present = [df for df in frames if col in df.columns]
+        values = [as_category(df[col]) for df in present]
+        categories = values[0].cat.categories.append(
+            [value.cat.categories for value in values[1:]]
+        ).unique()
+        for df, value in zip(present, values):
+            df[col] = value.cat.set_categories(categories)
+    return frames
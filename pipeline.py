@@ -0,0 +1,492 @@
+import os
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from cache import SharedCache, estimate_nbytes
+from compare import (
+    COMPARISON_COLUMNS,
+    DIFF_FIELDS,
+    SnapshotDiff,
+    build_comparison,
+    diff_snapshots,
+    has_active_status,
+)
+from diagnostics import StageRecorder
+from loader import PARSE_CACHE, any_status, eager_columns, file_digest, file_name, read_active, read_columns
+from managers import ManagerIndex
+from normalize import canonical_status, key_codes, lookup, recode, request_id_text
+from schemas import EXTRACT_SCHEMAS
+from snapshots import StoredSnapshot
+from stages import Stage, StagePipeline
+from statuses import STATUS_CLASSIFIER
+from timeline import Timeline, snapshot_date
+
+
+REQUIRED_COLUMNS = ["Request ID", "Status"]
+
+# Loaded pairs and comparisons shared by every session of the app process
+RESULT_CACHE_BYTES = int(os.environ.get("RESULT_CACHE_MB", 1024)) * 1024 * 1024
+SESSION_QUOTA_BYTES = int(os.environ.get("SESSION_QUOTA_MB", 256)) * 1024 * 1024
+RESULT_CACHE = SharedCache(RESULT_CACHE_BYTES, SESSION_QUOTA_BYTES)
+
+# Bumped whenever stored snapshots would be normalized differently (1: Request IDs
+# such as "REQ10.05" kept as written). Older ones are re-read from the upload.
+SNAPSHOT_VERSION = 1
+
+
+# ------------------ Active Extract ------------------
+def extract_active(file, cache=PARSE_CACHE, recorder=None):
+    recorder = recorder or StageRecorder()
+    if "Status" not in read_columns(file):
+        raise ValueError("'Status' column not found.")
+
+    # CSVs are streamed in chunks; only Active rows are kept
+    with recorder.stage("read_active") as metrics:
+        active_df = read_active(file, cache=cache)
+        metrics.rows = len(active_df)
+
+    # Add Hiring Manager column if missing
+    if "Hiring Manager" not in active_df.columns:
+        active_df["Hiring Manager"] = ""
+    return active_df
+
+
+def extract_outputs(active_df):
+    return {"active_requests": active_df}
+
+
+# ------------------ Compare OLD vs NEW ------------------
+def normalize_request_id(request_id):
+    return request_id_text(request_id)
+
+
+def standardize_status(status):
+    # Already canonical for fresh loads; also maps snapshots stored before a config change
+    return recode(status, canonical_status)
+
+
+def unknown_statuses(df):
+    # Statuses in the source file that statuses.json doesn't know, with their row counts
+    return STATUS_CLASSIFIER.unknown(df.attrs.get("status_counts", {}))
+
+
+def _read_snapshot(file, label, usecols, cache, recorder, keep=has_active_status):
+    # CSVs are streamed in chunks; Status is normalized and filtered per chunk
+    with recorder.stage(f"read_active ({label})") as metrics:
+        active = read_active(
+            file, keep=keep, normalize=True, usecols=usecols, cache=cache,
+            checkpoint=recorder.checkpoint,
+        )
+        metrics.rows = len(active)
+    with recorder.stage(f"normalize_request_id ({label})", rows=len(active)):
+        active["Request ID"] = normalize_request_id(active["Request ID"])
+    return active
+
+
+def _load_stored(store, snapshot_id, label, usecols, recorder, keep=has_active_status):
+    with recorder.stage(f"snapshot store load ({label})") as metrics:
+        active = store.load(snapshot_id, usecols)
+        # Re-applied so snapshots saved under an older status config stay consistent
+        active = active[lookup(active["Status"], keep)]
+        metrics.rows = len(active)
+    return active
+
+
+def stored_snapshot(store, snapshot_id):
+    # A stored snapshot in the current format, or None
+    stored = store.get(snapshot_id)
+    return stored if stored is not None and stored.version == SNAPSHOT_VERSION else None
+
+
+def listed_snapshots(store):
+    # The snapshots to offer for selection; older formats can no longer be trusted
+    return store.entries(version=SNAPSHOT_VERSION)
+
+
+def snapshot_ids(digest, compact, keep=has_active_status):
+    # Store ids that can serve a load, full snapshot first; the last one is saved.
+    # Snapshots with every status are kept apart from the active-only ones.
+    base = digest if keep is has_active_status else f"{digest}-all"
+    return [base, f"{base}-compact"] if compact else [base]
+
+
+def snapshot_digest(snapshot_id):
+    return snapshot_id.split("-")[0]
+
+
+def stored_with_all_statuses(store, snapshot):
+    # The every-status copy of a stored extract, when one was saved (e.g. by a timeline)
+    digest = snapshot_digest(snapshot.id)
+    for snapshot_id in snapshot_ids(digest, compact=True, keep=any_status):
+        stored = stored_snapshot(store, snapshot_id)
+        if stored is not None:
+            return stored
+    return None
+
+
+def load_snapshot(file, label, columns, compact=False, cache=PARSE_CACHE, store=None, recorder=None,
+                  keep=has_active_status):
+    # `keep` filters rows on the canonical Status; any_status keeps them all.
+    # A known layout's free-text columns are left out; see text_columns().
+    recorder = recorder or StageRecorder()
+    usecols = [c for c in COMPARISON_COLUMNS if c in columns] if compact else eager_columns(columns)
+    if isinstance(file, StoredSnapshot):
+        return _load_stored(store, file.id, label, usecols, recorder, keep)
+    if store is None:
+        return _read_snapshot(file, label, usecols, cache, recorder, keep)
+
+    # The same extract uploaded again (as OLD or NEW) is memory-mapped, not re-parsed
+    candidates = snapshot_ids(file_digest(file), compact, keep)
+    for snapshot_id in candidates:
+        if stored_snapshot(store, snapshot_id) is not None:
+            return _load_stored(store, snapshot_id, label, usecols, recorder, keep)
+
+    active = _read_snapshot(file, label, usecols, cache, recorder, keep)
+    with recorder.stage(f"snapshot store save ({label})", rows=len(active)):
+        store.save(candidates[-1], active, label, file_name(file), version=SNAPSHOT_VERSION)
+    return active
+
+
+def source_columns(file):
+    return list(file.columns) if isinstance(file, StoredSnapshot) else read_columns(file)
+
+
+def _in_order(df, header):
+    return df[[col for col in header if col in df.columns] + [col for col in df.columns if col not in header]]
+
+
+def text_columns(file, columns, compact=False, cache=PARSE_CACHE, store=None):
+    # The free-text columns load_snapshot() left out, as a function that adds them to
+    # the loaded rows (matched on row labels). Only added on first use, e.g. for a
+    # download; uploads are read into the store up front. None when nothing was left out.
+    if compact:
+        return None
+    schema = EXTRACT_SCHEMAS.match(columns)
+    header = columns
+    if isinstance(file, StoredSnapshot):
+        if schema is not None:
+            # Saved with every column, before free-text columns were split off
+            snapshot_id, lazy = file.id, schema.lazy_columns
+        else:
+            text = stored_snapshot(store, text_snapshot_id(file.id))
+            if text is None:
+                return None
+            snapshot_id, lazy, header = text.id, [col for col in text.columns if col != "Status"], None
+        read = lambda: store.load(snapshot_id, ["Status", *lazy])  # noqa: E731
+    elif schema is None:
+        return None
+    elif hasattr(file, "getvalue"):
+        # The result must not keep the upload alive, so its free-text columns are read now
+        read = _text_reader(file, schema.lazy_columns, cache, store)
+    else:
+        read = lambda: _text_reader(file, schema.lazy_columns, cache, store)()  # noqa: E731
+
+    def with_text(display):
+        text = read()
+        # Re-applied so the rows match the snapshot's, as in _load_stored()
+        text = text[lookup(text["Status"], has_active_status)].drop(columns="Status")
+        full = display.join(text)
+        layout = EXTRACT_SCHEMAS.match(list(full.columns))
+        return _in_order(full, header or (list(layout.columns) if layout else []))
+    return with_text
+
+
+def text_snapshot_id(snapshot_id):
+    return f"{snapshot_digest(snapshot_id)}-text"
+
+
+def _text_reader(file, lazy, cache, store):
+    # Reads the free-text columns once and returns a function that hands them back
+    # without referring to `file`: from the store, or held in memory without one
+    usecols = ["Status", *lazy]
+    snapshot_id = None if store is None else text_snapshot_id(file_digest(file))
+    if snapshot_id is None or stored_snapshot(store, snapshot_id) is None:
+        text = read_active(file, keep=has_active_status, normalize=True, usecols=usecols, cache=cache)
+        # Part of the extract's snapshot, not one to pick on its own
+        if snapshot_id is None or store.save(
+            snapshot_id, text, "TEXT", file_name(file), listed=False, version=SNAPSHOT_VERSION
+        ) is None:
+            return lambda: text
+    return lambda: store.load(snapshot_id, usecols)
+
+
+def load_active_pair(old_file, new_file, compact=False, cache=PARSE_CACHE, store=None, recorder=None,
+                     progress=None):
+    recorder = recorder or StageRecorder()
+    sources = [(file, label, source_columns(file)) for file, label in [(old_file, "OLD"), (new_file, "NEW")]]
+
+    for col in REQUIRED_COLUMNS:
+        if any(col not in columns for _, _, columns in sources):
+            raise ValueError(f"'{col}' column missing in one of the files")
+
+    # OLD and NEW are independent, so they are parsed and normalized side by side.
+    # CSVs are parsed in these threads; large workbooks in worker processes (see
+    # loader.SHEET_WORKERS), as openpyxl holds the GIL.
+    # `progress` is called from this thread as each one finishes.
+    loaded = {}
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        futures = {
+            pool.submit(load_snapshot, file, label, columns, compact, cache, store, recorder): label
+            for file, label, columns in sources
+        }
+        for future in as_completed(futures):
+            label = futures[future]
+            loaded[label] = future.result()
+            if progress is not None:
+                progress(label, loaded[label])
+    return tuple(loaded[label] for _, label, _ in sources)
+
+
+def build_final_view(comparison_df):
+    # Active, Partially Filled, Zero Filled from BOTH files, sorted by Status then Request ID.
+    # Only the sort keys are sorted; the rows are then gathered once in that order.
+    status_order = lookup(comparison_df["Status"], STATUS_CLASSIFIER.sort_order)
+    _, (request_keys,) = key_codes(comparison_df["Request ID"])
+    # Missing IDs (-1) sort last within their status
+    request_keys = np.where(request_keys < 0, len(request_keys), request_keys)
+    order = np.lexsort((request_keys, status_order))
+    final_df = comparison_df.take(order).reset_index(drop=True)
+    # Shares the Source column's data under copy-on-write
+    final_df["File Source"] = final_df["Source"]
+    return final_df
+
+
+def display_snapshot(active):
+    # Only the Status column is new; the others share the snapshot's data
+    display = active.copy(deep=False)
+    display["Status"] = recode(display["Status"], canonical_status)
+    return display
+
+
+def status_breakdown(df):
+    # Source x Status counts; plain column labels so the table serializes cleanly
+    breakdown = df.groupby(["Source", "Status"], observed=True).size().unstack(fill_value=0)
+    breakdown.columns = breakdown.columns.astype(str)
+    return breakdown
+
+
+@dataclass
+class CompareResult:
+    old_active: pd.DataFrame
+    new_active: pd.DataFrame
+    # Both snapshots in display order; the concatenated frame it is built from is dropped
+    final_df: pd.DataFrame
+    diff: SnapshotDiff = field(default=None)
+    # From text_columns(): add the free-text columns left out of old_active/new_active
+    old_text: object = None
+    new_text: object = None
+
+    @cached_property
+    def manager_index(self):
+        # Built on first use, then every Hiring Manager filter change is a lookup
+        return ManagerIndex(self.final_df)
+
+    @cached_property
+    def old_display(self):
+        return display_snapshot(self.old_active)
+
+    @cached_property
+    def new_display(self):
+        return display_snapshot(self.new_active)
+
+    @cached_property
+    def old_with_text(self):
+        # Only built when asked for; nothing in the comparison reads these columns
+        return self.old_display if self.old_text is None else self.old_text(self.old_display)
+
+    @cached_property
+    def new_with_text(self):
+        return self.new_display if self.new_text is None else self.new_text(self.new_display)
+
+    @cached_property
+    def source_stats(self):
+        return status_breakdown(self.final_df)
+
+    def nbytes(self):
+        # Frames built by the comparison; old_active/new_active belong to the loaded pair
+        frames = [self.final_df]
+        if self.diff is not None:
+            frames.append(self.diff.table)
+        return sum(estimate_nbytes(df) for df in frames)
+
+    def outputs(self):
+        # Same files as the Compare tab's download buttons
+        outputs = {"active_statuses_from_both_files": self.final_df}
+        if not self.old_active.empty:
+            outputs["active_statuses_old_file"] = self.old_with_text
+        if not self.new_active.empty:
+            outputs["active_statuses_new_file"] = self.new_with_text
+        if self.diff is not None and not self.diff.empty:
+            outputs["active_status_comparison"] = self.diff.view
+        return outputs
+
+
+def compare_active(old_active, new_active, recorder=None, old_text=None, new_text=None):
+    recorder = recorder or StageRecorder()
+    rows = len(old_active) + len(new_active)
+    with recorder.stage("build_comparison", rows=rows):
+        comparison_df = build_comparison(old_active, new_active)
+    with recorder.stage("standardize_status", rows=rows):
+        comparison_df["Status"] = standardize_status(comparison_df["Status"])
+
+    # Join OLD vs NEW once on Request ID and classify every request
+    diff = None
+    if not old_active.empty and not new_active.empty:
+        # A field one extract lacks is blank on that side, not changed
+        fields = [f for f in DIFF_FIELDS if f in old_active.columns and f in new_active.columns]
+        with recorder.stage("diff") as metrics:
+            diff = diff_snapshots(comparison_df, fields)
+            metrics.rows = len(diff.table)
+
+    with recorder.stage("final_view", rows=rows):
+        final_df = build_final_view(comparison_df)
+    return CompareResult(old_active, new_active, final_df, diff, old_text, new_text)
+
+
+def compare_files(old_file, new_file, compact=False, cache=PARSE_CACHE, store=None, recorder=None):
+    recorder = recorder or StageRecorder()
+    old_active, new_active = load_active_pair(old_file, new_file, compact, cache, store, recorder)
+    old_text, new_text = (
+        text_columns(file, source_columns(file), compact, cache, store) for file in [old_file, new_file]
+    )
+    return compare_active(old_active, new_active, recorder, old_text, new_text)
+
+
+# ------------------ Multi-Snapshot Timeline ------------------
+def source_key(file):
+    return file.id if isinstance(file, StoredSnapshot) else file_digest(file)
+
+
+def source_name(file):
+    return file.name if isinstance(file, StoredSnapshot) else file_name(file)
+
+
+def extend_timeline(timeline, files, cache=PARSE_CACHE, store=None):
+    # Dates come from the file names when every snapshot has one, else snapshot order
+    names = [source_name(file) for file in files]
+    dates = [snapshot_date(name) for name in names]
+    times = dates if all(date is not None for date in dates) else list(range(len(files)))
+    # Upload file_ids: a rerun doesn't re-hash every snapshot just to compare keys
+    keys = [source_token(file) for file in files]
+
+    # Reuse the existing history when it is a prefix of the requested snapshots
+    if (
+        timeline is None
+        or timeline.keys != keys[:len(timeline)]
+        or timeline.times != times[:len(timeline)]
+    ):
+        timeline = Timeline()
+
+    for file, name, at, key in list(zip(files, names, times, keys))[len(timeline):]:
+        if isinstance(file, StoredSnapshot):
+            # Snapshots saved by Compare hold active rows only; a request that went
+            # inactive then shows as removed unless an every-status copy exists
+            file = stored_with_all_statuses(store, file) or file
+        columns = source_columns(file)
+        for col in REQUIRED_COLUMNS:
+            if col not in columns:
+                raise ValueError(f"'{col}' column missing in {name}")
+        # Every status is kept, so moves into inactive statuses are transitions, not removals
+        snapshot = load_snapshot(
+            file, "TIMELINE", columns, compact=True, cache=cache, store=store, keep=any_status
+        )
+        snapshot["Status"] = standardize_status(snapshot["Status"])
+        timeline.add(snapshot, name, at=at, key=key)
+    return timeline
+
+
+# ------------------ Session Pipeline ------------------
+def source_token(file):
+    # Cheap identity for reruns: Streamlit gives every upload a file_id, so the
+    # content is only hashed for paths and stored snapshots
+    return getattr(file, "file_id", None) or source_key(file)
+
+
+def _manager_index(result, recorder=None):
+    recorder = recorder or StageRecorder()
+    with recorder.stage("manager_index", rows=len(result.final_df)):
+        return result.manager_index
+
+
+def compare_pipeline(cache=PARSE_CACHE, store=None, shared=None):
+    # Inputs: old, new, compact (upstream) and manager, source (Hiring Manager filters).
+    # A filter change reruns only the last three stages. With `shared`, the loaded
+    # pair and comparison are looked up by content, so sessions comparing the same
+    # extracts hold one copy between them; a pair or comparison past the session's
+    # quota fails with cache.QuotaExceeded.
+    owner = uuid.uuid4().hex
+
+    def pair_key(old, new, compact):
+        return source_key(old), source_key(new), compact
+
+    def load(key, old, new, compact, recorder=None, progress=None):
+        def build():
+            return load_active_pair(old, new, compact, cache, store, recorder, progress)
+        if shared is None:
+            return build()
+        # New inputs: this session no longer needs the previous pair and comparison.
+        # They leave the pipeline too, so no released entry is still held here.
+        pipeline.discard(*(name for name in pipeline.stages if name != "pair_key"))
+        shared.release(owner)
+        return shared.acquire(owner, ("pair",) + key, build)
+
+    def compare(key, loaded, old, new, compact, recorder=None):
+        def build():
+            old_text, new_text = (
+                text_columns(file, source_columns(file), compact, cache, store) for file in [old, new]
+            )
+            return compare_active(*loaded, recorder, old_text, new_text)
+        if shared is None:
+            return build()
+        return shared.acquire(owner, ("compare",) + key, build)
+
+    pipeline = StagePipeline({
+        "pair_key": Stage(pair_key, inputs=("old", "new", "compact")),
+        "load": Stage(
+            load, deps=("pair_key",), inputs=("old", "new", "compact"), context=("recorder", "progress")
+        ),
+        "compare": Stage(
+            compare, deps=("pair_key", "load"), inputs=("old", "new", "compact"), context=("recorder",)
+        ),
+        "old_display": Stage(lambda result: result.old_display, deps=("compare",)),
+        "new_display": Stage(lambda result: result.new_display, deps=("compare",)),
+        "old_with_text": Stage(lambda result: result.old_with_text, deps=("compare",)),
+        "new_with_text": Stage(lambda result: result.new_with_text, deps=("compare",)),
+        "source_stats": Stage(lambda result: result.source_stats, deps=("compare",)),
+        "manager_index": Stage(_manager_index, deps=("compare",), context=("recorder",)),
+        "records": Stage(ManagerIndex.records, deps=("manager_index",), inputs=("manager", "source")),
+        "status_distribution": Stage(
+            ManagerIndex.status_distribution, deps=("manager_index",), inputs=("manager", "source")
+        ),
+        "breakdown": Stage(ManagerIndex.breakdown, deps=("manager_index",), inputs=("manager", "source")),
+    })
+    if shared is not None:
+        # Session state is dropped when the session ends; its references go with it
+        weakref.finalize(pipeline, shared.release, owner)
+    return pipeline
+
+
+def compare_job(pipeline, old, new, compact):
+    # Background half of the Compare tab, run as jobs.JOBS.submit(compare_job(...)):
+    # load and compare through the session's `pipeline`. Downloads are still
+    # serialized only on click.
+    def run(job):
+        def loaded(label, active):
+            job.report(f"Loaded {label} ({len(active)} active records)")
+
+        # A cancelled job for the same session may still be winding down
+        with pipeline.lock:
+            job.recorder.checkpoint()
+            pipeline.set_input("old", old, token=source_token(old))
+            pipeline.set_input("new", new, token=source_token(new))
+            pipeline.set_input("compact", compact)
+            result = pipeline.get("compare", recorder=job.recorder, progress=loaded)
+            pipeline.get("manager_index", recorder=job.recorder)
+        return result
+    return run
@@ -0,0 +1,80 @@
+import json
+import os
+
+
+# Known extract layouts: the columns of each and how they are parsed
+SCHEMA_CONFIG = os.environ.get(
+    "SCHEMA_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemas.json")
+)
+
+# Column kinds in the config. "auto" columns keep pandas' inferred dtype; Request IDs
+# in particular are left to normalize.request_id_text(), which handles both formats.
+COLUMN_KINDS = {"auto", "category", "date", "text"}
+
+
+class ExtractSchema:
+    """One extract layout, matched on its header regardless of column order.
+
+    "text" columns are wide free text (descriptions, addresses) that no comparison
+    uses; lazy reads leave them out (see loader.read_file).
+    """
+
+    def __init__(self, name, columns, date_format=None):
+        unknown = set(columns.values()) - COLUMN_KINDS
+        if unknown:
+            raise ValueError(f"Layout '{name}' has unknown column kinds: {sorted(unknown)}")
+        self.name = name
+        self.columns = dict(columns)
+        self.date_format = date_format
+
+    def matches(self, columns):
+        return set(columns) == set(self.columns)
+
+    def _of_kind(self, kind, usecols=None):
+        selected = [col for col, col_kind in self.columns.items() if col_kind == kind]
+        if usecols is None:
+            return selected
+        if callable(usecols):
+            return [col for col in selected if usecols(col)]
+        return [col for col in selected if col in usecols]
+
+    @property
+    def lazy_columns(self):
+        return self._of_kind("text")
+
+    @property
+    def eager_columns(self):
+        return [col for col, kind in self.columns.items() if kind != "text"]
+
+    def read_options(self, usecols=None):
+        # dtype / date options for pd.read_csv and pd.read_excel, limited to the columns read
+        options = {}
+        categories = self._of_kind("category", usecols)
+        if categories:
+            options["dtype"] = dict.fromkeys(categories, "category")
+        dates = self._of_kind("date", usecols)
+        if dates:
+            options["parse_dates"] = dates
+            if self.date_format:
+                options["date_format"] = self.date_format
+        return options
+
+
+class SchemaRegistry:
+    def __init__(self, layouts):
+        self.layouts = [
+            ExtractSchema(layout["name"], layout["columns"], layout.get("date_format"))
+            for layout in layouts
+        ]
+
+    @classmethod
+    def from_file(cls, path=SCHEMA_CONFIG):
+        with open(path) as fh:
+            return cls(json.load(fh)["layouts"])
+
+    def match(self, columns):
+        # None for a header that isn't a known layout; it is then parsed as before
+        return next((schema for schema in self.layouts if schema.matches(columns)), None)
+
+
+EXTRACT_SCHEMAS = SchemaRegistry.from_file()
@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+import pyarrow as pa
+
+
+# Normalized active snapshots, stored as uncompressed Arrow IPC so they can be memory-mapped
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", ".snapshots")
+
+
+@dataclass(frozen=True)
+class StoredSnapshot:
+    id: str
+    label: str
+    name: str
+    rows: int
+    columns: tuple
+    saved_at: str
+    listed: bool = True
+    # Format of the stored data as set by the caller; 0 for snapshots saved without one
+    version: int = 0
+
+    def describe(self):
+        return f"{self.label} · {self.name} · {self.rows} rows · {self.saved_at}"
+
+
+class SnapshotStore:
+    """On-disk store of normalized snapshots, keyed by upload content hash."""
+
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.root, "index.json")
+
+    def data_path(self, snapshot_id):
+        return os.path.join(self.root, f"{snapshot_id}.arrow")
+
+    def _read_index(self):
+        try:
+            with open(self.index_path) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {}
+
+    def _write_index(self, index):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(index, fh, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def entries(self, version=None):
+        # With a `version`, snapshots saved in any other format are left out
+        snapshots = [
+            StoredSnapshot(**dict(entry, columns=tuple(entry["columns"])))
+            for entry in self._read_index().values()
+            if entry.get("listed", True)
+            and (version is None or entry.get("version", 0) == version)
+            and os.path.exists(self.data_path(entry["id"]))
+        ]
+        return sorted(snapshots, key=lambda s: s.saved_at, reverse=True)
+
+    def get(self, snapshot_id):
+        entry = self._read_index().get(snapshot_id)
+        if entry is None or not os.path.exists(self.data_path(snapshot_id)):
+            return None
+        return StoredSnapshot(**dict(entry, columns=tuple(entry["columns"])))
+
+    def save(self, snapshot_id, df, label, name, listed=True, version=0):
+        # Unlisted snapshots are left out of entries(), e.g. columns split off another snapshot.
+        # A snapshot saved in another format is replaced.
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            path = self.data_path(snapshot_id)
+            saved = self._read_index().get(snapshot_id)
+            if not os.path.exists(path) or saved is None or saved.get("version", 0) != version:
+                try:
+                    table = pa.Table.from_pandas(df, preserve_index=True)
+                except pa.ArrowException:
+                    # e.g. mixed-type object columns from Excel; just don't persist
+                    return None
+                tmp_path = path + ".tmp"
+                with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+                os.replace(tmp_path, path)
+
+            snapshot = StoredSnapshot(
+                id=snapshot_id,
+                label=label,
+                name=name,
+                rows=len(df),
+                columns=tuple(str(col) for col in df.columns),
+                saved_at=datetime.now().isoformat(timespec="seconds"),
+                listed=listed,
+                version=version,
+            )
+            index = self._read_index()
+            index[snapshot_id] = asdict(snapshot)
+            self._write_index(index)
+        return snapshot
+
+    def load(self, snapshot_id, columns=None):
+        # Memory-mapped: numeric buffers are used in place rather than re-read
+        table = pa.ipc.open_file(pa.memory_map(self.data_path(snapshot_id))).read_all()
+        if columns is not None:
+            index_columns = [
+                col for col in table.schema.pandas_metadata.get("index_columns", [])
+                if isinstance(col, str)
+            ]
+            keep = [col for col in columns if col in table.column_names]
+            table = table.select(keep + index_columns)
+        return table.to_pandas(split_blocks=True)
+
+
+SNAPSHOT_STORE = SnapshotStore()
@@ -0,0 +1,62 @@
+import threading
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Stage:
+    # func(*upstream values, *input values, **context)
+    func: object
+    deps: tuple = ()
+    inputs: tuple = ()
+    # Per-call extras such as the StageRecorder; never part of the memo key
+    context: tuple = ()
+
+
+class StagePipeline:
+    """Named stages with explicit dependencies, memoized between calls.
+
+    A stage is recomputed only when one of its inputs or upstream stages has
+    changed since it last ran; otherwise its previous value is returned. Held in
+    Streamlit session state, this lets a widget change rerun only the stages
+    downstream of it.
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        self._inputs = {}   # name -> (token, value)
+        self._results = {}  # name -> (key, version, value)
+        self._version = 0
+        # Held by background jobs while they set inputs and run stages
+        self.lock = threading.Lock()
+
+    def set_input(self, name, value, token=None):
+        # `token` stands in for values that are costly to compare, e.g. an upload
+        self._inputs[name] = (value if token is None else token, value)
+
+    def discard(self, *names):
+        # Drops memoized values, e.g. ones whose memory is accounted for elsewhere
+        for name in names:
+            self._results.pop(name, None)
+
+    def _key(self, stage):
+        return (
+            tuple(self._inputs[name][0] for name in stage.inputs),
+            tuple(self._results[dep][1] for dep in stage.deps),
+        )
+
+    def get(self, name, **context):
+        stage = self.stages[name]
+        for dep in stage.deps:
+            self.get(dep, **context)
+
+        key = self._key(stage)
+        cached = self._results.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[2]
+
+        args = [self._results[dep][2] for dep in stage.deps]
+        args += [self._inputs[input_name][1] for input_name in stage.inputs]
+        value = stage.func(*args, **{k: v for k, v in context.items() if k in stage.context})
+        self._version += 1
+        self._results[name] = (key, self._version, value)
+        return value
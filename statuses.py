@@ -0,0 +1,80 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Canonical statuses, their aliases, sort order and whether they count as active
+STATUS_CONFIG = os.environ.get(
+    "STATUS_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "statuses.json")
+)
+
+
+def status_key(values):
+    # Case, surrounding whitespace and -/_ separators never distinguish two statuses
+    return values.astype(str).str.strip().str.lower().str.replace(r"[\s_-]+", " ", regex=True)
+
+
+class StatusClassifier:
+    """Exact-match status lookup built from the status config.
+
+    Functions here take a Series of distinct values (see normalize.lookup), so
+    the cost scales with the number of distinct statuses, not rows.
+    """
+
+    def __init__(self, statuses):
+        self.names = [status["name"] for status in statuses]
+        self.order = {status["name"]: status.get("order", i + 1) for i, status in enumerate(statuses)}
+        self.active = [status["name"] for status in statuses if status.get("active", False)]
+        # Anything not in the config sorts after every known status
+        self.unknown_order = max(self.order.values(), default=0) + 1
+
+        self._aliases = {}
+        for status in statuses:
+            spellings = pd.Series([status["name"]] + list(status.get("aliases", [])))
+            for key in status_key(spellings):
+                if self._aliases.setdefault(key, status["name"]) != status["name"]:
+                    raise ValueError(
+                        f"Status alias '{key}' maps to both '{self._aliases[key]}' and '{status['name']}'"
+                    )
+
+    @classmethod
+    def from_file(cls, path=STATUS_CONFIG):
+        with open(path) as fh:
+            return cls(json.load(fh)["statuses"])
+
+    def canonical(self, values):
+        # Known spellings become the configured name; unknown ones are kept as written
+        values = pd.Series(values)
+        names = status_key(values).map(self._aliases)
+        unknown = names.isna() & values.notna()
+        return names.where(~unknown, values.astype(str).str.strip()).astype(object)
+
+    def is_known(self, values):
+        values = pd.Series(values)
+        return (values.notna() & status_key(values).isin(self._aliases)).to_numpy()
+
+    def is_active(self, values):
+        return self.canonical(values).isin(self.active).to_numpy()
+
+    def sort_order(self, values):
+        return self.canonical(values).map(self.order).fillna(self.unknown_order).to_numpy()
+
+    def unknown(self, counts):
+        # counts: {status: rows}; returns the statuses missing from the config
+        statuses = pd.Series(list(counts), dtype=object)
+        known = self.is_known(statuses) | statuses.isin(["", "(blank)"]).to_numpy()
+        return {status: counts[status] for status in statuses[~known]}
+
+
+STATUS_CLASSIFIER = StatusClassifier.from_file()
+
+
+def status_counts(status):
+    # Rows per canonical status; each distinct value is classified once
+    counts = status.value_counts(dropna=False)
+    canonical = STATUS_CLASSIFIER.canonical(counts.index.to_series(index=np.arange(len(counts))))
+    canonical = canonical.fillna("(blank)").to_numpy()
+    counts = counts.groupby(canonical).sum()
+    return counts[counts > 0]
@@ -0,0 +1,99 @@
+import pytest
+
+from cache import QuotaExceeded, SharedCache
+
+
+def counting(value):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return value
+    return factory, calls
+
+
+def test_entry_shared_between_owners():
+    cache = SharedCache(1000, 1000)
+    factory, calls = counting(b"x" * 50)
+    first = cache.acquire("s1", "a", factory)
+    second = cache.acquire("s2", "a", factory)
+    assert first is second
+    assert len(calls) == 1
+    assert cache.refcount("a") == 2
+
+
+def test_acquired_entry_kept_when_it_fills_the_budget():
+    cache = SharedCache(100, 1000)
+    cache.acquire("s1", "a", lambda: b"x" * 60)
+    cache.release("s1")
+    factory, calls = counting(b"y" * 50)
+    cache.acquire("s2", "b", factory)
+    cache.acquire("s3", "b", factory)
+    assert len(calls) == 1
+    assert "a" not in cache
+    assert cache.refcount("b") == 2
+
+
+def test_referenced_entries_never_evicted():
+    cache = SharedCache(100, 1000)
+    cache.acquire("s1", "a", lambda: b"x" * 60)
+    cache.acquire("s2", "b", lambda: b"y" * 40)
+    cache.release("s1")
+    assert "a" in cache
+
+    cache.acquire("s3", "c", lambda: b"z" * 50)
+    assert "a" not in cache
+    assert "b" in cache and "c" in cache
+    assert cache.owners == 2
+
+
+def test_release_one_key():
+    cache = SharedCache(1000, 1000)
+    cache.acquire("s1", "a", lambda: b"x" * 10)
+    cache.acquire("s1", "b", lambda: b"y" * 10)
+    cache.release("s1", "a")
+    assert cache.refcount("a") == 0
+    assert cache.refcount("b") == 1
+    # Unreferenced but within budget: still cached for the next session
+    assert "a" in cache
+
+
+def test_owner_quota_turns_value_away():
+    cache = SharedCache(1000, 100)
+    cache.acquire("s1", "a", lambda: b"x" * 60)
+    with pytest.raises(QuotaExceeded):
+        cache.acquire("s1", "b", lambda: b"y" * 60)
+    # The entry the owner already holds is kept
+    assert cache.refcount("a") == 1
+    assert "b" not in cache
+    assert cache.owned_nbytes("s1") == 60
+
+
+def test_held_entries_not_evicted_past_budget():
+    cache = SharedCache(150, 100)
+    pair = cache.acquire("s1", "pair", lambda: b"x" * 60)
+    cache.acquire("s1", "compare", lambda: b"y" * 30)
+    with pytest.raises(QuotaExceeded):
+        cache.acquire("s3", "other", lambda: b"z" * 80)
+    assert cache.acquire("s2", "pair", lambda: b"x" * 60) is pair
+
+
+def test_value_larger_than_budget_not_kept():
+    cache = SharedCache(100, 1000)
+    factory, calls = counting(b"x" * 200)
+    with pytest.raises(QuotaExceeded):
+        cache.acquire("s1", "a", factory)
+    assert "a" not in cache
+    assert cache.owners == 0
+
+
+def test_failed_build_can_be_retried():
+    cache = SharedCache(100, 1000)
+
+    def fail():
+        raise RuntimeError("build failed")
+    try:
+        cache.acquire("s1", "a", fail)
+    except RuntimeError:
+        pass
+    assert cache.acquire("s1", "a", lambda: b"x") == b"x"
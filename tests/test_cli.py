@@ -0,0 +1,30 @@
+import pandas as pd
+
+from cli import main, pair_inputs
+
+
+def write(path):
+    pd.DataFrame({"Request ID": ["1"], "Status": ["Active"]}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_single_files_are_paired_whatever_their_names(tmp_path):
+    old, new = write(tmp_path / "a.csv"), write(tmp_path / "b.csv")
+    assert pair_inputs([old], [new]) == ([("a_vs_b", old, new)], [])
+
+
+def test_directories_are_paired_by_name(tmp_path):
+    (tmp_path / "old").mkdir()
+    (tmp_path / "new").mkdir()
+    for name in ["x.csv", "y.csv"]:
+        write(tmp_path / "old" / name)
+    write(tmp_path / "new" / "x.csv")
+    pairs, unmatched = pair_inputs([str(tmp_path / "old")], [str(tmp_path / "new")])
+    assert [name for name, _, _ in pairs] == ["x"]
+    assert unmatched == ["y"]
+
+
+def test_no_pairs_matched(tmp_path, capsys):
+    old = write(tmp_path / "a.csv")
+    assert main(["compare", "--old", old, "--new", str(tmp_path / "missing.csv")]) == 1
+    assert "No OLD/NEW file pairs matched" in capsys.readouterr().err
@@ -0,0 +1,83 @@
+import itertools
+import os
+
+import pandas as pd
+import pytest
+
+from compare import MANAGER_CHANGED, UNCHANGED, build_comparison
+from pipeline import build_final_view, compare_files, load_active_pair, standardize_status
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUNDLED = [
+    os.path.join(ROOT, name)
+    for name in [
+        "job_openings_dummy.csv",
+        "job_openings_dummy1.csv",
+        "job_openings_dummy2.csv",
+        "hiringman_with_diff_status.csv",
+    ]
+]
+PAIRS = list(itertools.permutations(BUNDLED, 2))
+
+
+def reference_comparison(old_active, new_active):
+    # The row loop build_comparison() replaced
+    rows = []
+    for source, active in [("OLD", old_active), ("NEW", new_active)]:
+        for _, row in active.iterrows():
+            rows.append({
+                "Source": source,
+                "Request ID": row["Request ID"],
+                "Status": row["Status"],
+                "Hiring Manager": row.get("Hiring Manager", ""),
+                "Job Title": row.get("Job Title", ""),
+                "Interviewed?": row.get("Interviewed?", ""),
+                "Work Site Name": row.get("Work Site Name", ""),
+                "Total Positions": row.get("Total Positions", ""),
+            })
+    return pd.DataFrame(rows)
+
+
+def reference_final_view(comparison_df):
+    # The Status_Order sort build_final_view() replaced
+    final_df = comparison_df.copy()
+    final_df["File Source"] = final_df["Source"]
+    status_order = {"Active": 1, "Partially Filled": 2, "Zero Filled": 3}
+    final_df["Status_Order"] = final_df["Status"].astype(object).map(status_order).fillna(99)
+    final_df = final_df.sort_values(["Status_Order", "Request ID"]).drop("Status_Order", axis=1)
+    return final_df.reset_index(drop=True)
+
+
+def as_text(df):
+    # Categoricals and inferred dtypes differ from the row loop's; the values must not
+    return df.astype(object).where(df.notna(), None).astype(str).reset_index(drop=True)
+
+
+@pytest.fixture(scope="module", params=PAIRS, ids=lambda pair: "-".join(os.path.basename(p) for p in pair))
+def active_pair(request):
+    return load_active_pair(*request.param, cache=None)
+
+
+def test_build_comparison_matches_row_loop(active_pair):
+    expected = reference_comparison(*active_pair)
+    actual = build_comparison(*active_pair)
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(as_text(actual), as_text(expected))
+
+
+def test_build_final_view_matches_sort(active_pair):
+    comparison_df = build_comparison(*active_pair)
+    comparison_df["Status"] = standardize_status(comparison_df["Status"])
+    expected = reference_final_view(comparison_df)
+    actual = build_final_view(comparison_df)
+    pd.testing.assert_frame_equal(as_text(actual), as_text(expected))
+
+
+def test_manager_missing_from_one_file_is_not_a_change():
+    # dummy1 has no Hiring Manager column
+    result = compare_files(BUNDLED[0], BUNDLED[1], cache=None)
+    counts = result.diff.counts()
+    assert MANAGER_CHANGED not in counts
+    assert counts.get(UNCHANGED, 0) > 0
+    assert "Manager Changed?" not in result.diff.view.columns
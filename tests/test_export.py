@@ -0,0 +1,41 @@
+import io
+from unittest import mock
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import export
+from export import serialize
+
+
+def frame():
+    return pd.DataFrame({
+        "Request ID": ["R1", "R2"],
+        "Start Date": pd.to_datetime(["2026-04-15", None]),
+        "Updated": pd.to_datetime(["2026-04-15 09:30", "2026-04-16 00:00"]),
+    })
+
+
+def cells(data):
+    sheet = load_workbook(io.BytesIO(data)).active
+    return [[(cell.value, cell.number_format) for cell in row] for row in sheet.iter_rows(min_row=2)]
+
+
+@pytest.mark.parametrize("writer", ["xlsxwriter", "openpyxl"])
+def test_xlsx_dates_keep_their_precision(writer):
+    if writer == "openpyxl":
+        with mock.patch.object(export.importlib.util, "find_spec", return_value=None):
+            data = serialize(frame(), "xlsx")
+    else:
+        data = serialize(frame(), "xlsx")
+    first, second = cells(data)
+    assert first[1][1] == "yyyy-mm-dd"
+    assert first[1][0].date().isoformat() == "2026-04-15"
+    assert second[1][0] is None
+    # A column with times of day keeps them
+    assert "h" in first[2][1]
+
+
+def test_csv_dates_stay_date_only():
+    assert b"R1,2026-04-15," in serialize(frame(), "csv")
@@ -0,0 +1,44 @@
+import gc
+
+import pandas as pd
+
+from cache import LRUCache
+from grid import grid_order
+
+
+def frame():
+    return pd.DataFrame({
+        "Request ID": ["R3", "R1", "R2", "R4"],
+        "Hiring Manager": ["Bob White", "Ann Lee", "bob stone", None],
+    })
+
+
+def test_search_and_sort():
+    df = frame()
+    assert list(grid_order(df, "BOB", cache=None)) == [0, 2]
+    assert list(grid_order(df, "", "Request ID", cache=None)) == [1, 2, 0, 3]
+    # Missing values sort last in either direction
+    assert list(grid_order(df, "", "Hiring Manager", ascending=False, cache=None)) == [2, 0, 1, 3]
+
+
+def test_order_cached_per_frame_object():
+    cache = LRUCache(1024 * 1024)
+    df = frame()
+    first = grid_order(df, "bob", cache=cache)
+    assert grid_order(df, "bob", cache=cache) is first
+
+    # An equal but separate frame is looked up on its own
+    other = grid_order(frame(), "bob", cache=cache)
+    assert other is not first
+    assert list(other) == list(first)
+
+
+def test_entry_dropped_with_its_frame():
+    cache = LRUCache(1024 * 1024)
+    df = frame()
+    grid_order(df, "bob", cache=cache)
+    grid_order(df, "", "Request ID", cache=cache)
+    assert len(cache) == 2
+    del df
+    gc.collect()
+    assert len(cache) == 0
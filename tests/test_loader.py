@@ -0,0 +1,64 @@
+import time
+
+import pandas as pd
+import pytest
+
+import loader
+from compare import has_active_status
+
+
+class Cancelled(Exception):
+    pass
+
+
+def cancel_after(calls):
+    seen = []
+
+    def checkpoint():
+        seen.append(1)
+        if len(seen) > calls:
+            raise Cancelled()
+    return checkpoint
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "extract.xlsx"
+    df = pd.DataFrame({"Request ID": [f"R{i}" for i in range(200)], "Status": ["Active", "Closed"] * 100})
+    with pd.ExcelWriter(path) as writer:
+        for sheet in range(3):
+            df.to_excel(writer, sheet_name=f"part{sheet}", index=False)
+    return path
+
+
+def test_sheets_read_in_worker_processes(workbook, monkeypatch):
+    monkeypatch.setattr(loader, "PARALLEL_SHEETS_MIN_BYTES", 0)
+    active = loader._stream_rows(workbook, has_active_status, False, None, 1000, workers=2)
+    assert len(active) == 300
+    assert active.index[-1] == 598
+
+
+def test_cancel_does_not_wait_for_worker_processes(workbook, monkeypatch):
+    monkeypatch.setattr(loader, "PARALLEL_SHEETS_MIN_BYTES", 0)
+    monkeypatch.setattr(loader, "CHECKPOINT_SECONDS", 0.05)
+    start = time.perf_counter()
+    with pytest.raises(Cancelled):
+        loader._stream_rows(
+            workbook, has_active_status, False, None, 1000, workers=2, checkpoint=cancel_after(1)
+        )
+    # Starting the spawned workers alone takes about a second
+    assert time.perf_counter() - start < 1
+
+
+def test_cancel_between_sheets(workbook):
+    with pytest.raises(Cancelled):
+        loader.read_active(workbook, keep=has_active_status, cache=None, checkpoint=cancel_after(2))
+
+
+def test_single_sheet_read_in_worker_process(tmp_path, monkeypatch):
+    path = tmp_path / "single.xlsx"
+    pd.DataFrame({"Request ID": ["R1", "R2"], "Status": ["Active", "Closed"]}).to_excel(path, index=False)
+    monkeypatch.setattr(loader, "PARALLEL_SHEETS_MIN_BYTES", 0)
+    monkeypatch.setattr(loader, "_parse_sheets", None)
+    active = loader._stream_rows(path, has_active_status, False, None, 1000, workers=1)
+    assert active["Request ID"].tolist() == ["R1"]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from loader import file_digest
+from managers import ManagerIndex
+from normalize import key_codes, request_id_text
+from pipeline import SNAPSHOT_VERSION, listed_snapshots, load_snapshot, snapshot_ids
+from snapshots import SnapshotStore
+from timeline import _slim
+
+
+def test_request_id_text_keeps_ids_as_written():
+    ids = pd.Series(["REQ10.05", "1001.0", " 1002 ", "10.50", np.nan], dtype=object)
+    assert request_id_text(ids).tolist()[:4] == ["REQ10.05", "1001", "1002", "10.50"]
+    assert pd.isna(request_id_text(ids).iloc[4])
+
+
+def test_request_id_text_numeric_columns():
+    ids = pd.Series([1001.0, 1002.0, np.nan])
+    assert request_id_text(ids).tolist()[:2] == ["1001", "1002"]
+    assert pd.isna(request_id_text(ids).iloc[2])
+
+
+def test_key_codes_shared_across_series():
+    uniques, (old, new) = key_codes(pd.Series(["B", "A", None]), pd.Series(["A", "C"]))
+    assert list(uniques) == ["A", "B", "C"]
+    assert old.tolist() == [1, 0, -1]
+    assert new.tolist() == [0, 2]
+
+
+def test_legacy_stored_snapshot_is_read_again(tmp_path):
+    path = tmp_path / "openings.csv"
+    pd.DataFrame({"Request ID": ["REQ10.05", "REQ7"], "Status": ["Active", "Active"]}).to_csv(path, index=False)
+    store = SnapshotStore(str(tmp_path / "store"))
+    # As saved before "REQ10.05" was kept as written
+    snapshot_id = snapshot_ids(file_digest(str(path)), compact=False)[-1]
+    legacy = pd.DataFrame({"Request ID": ["REQ105", "REQ7"], "Status": ["Active", "Active"]})
+    store.save(snapshot_id, legacy, "OLD", str(path))
+    assert listed_snapshots(store) == []
+
+    active = load_snapshot(str(path), "OLD", ["Request ID", "Status"], store=store)
+    assert active["Request ID"].tolist() == ["REQ10.05", "REQ7"]
+    assert store.get(snapshot_id).version == SNAPSHOT_VERSION
+    assert store.load(snapshot_id)["Request ID"].tolist() == ["REQ10.05", "REQ7"]
+    assert [s.id for s in listed_snapshots(store)] == [snapshot_id]
+
+
+def test_request_dedup_on_codes():
+    final_df = pd.DataFrame({
+        "Request ID": ["1", "1", "2", "1", None, None],
+        "Hiring Manager": ["Ann", "Ann", "Ann", "Bob", "Bob", "Bob"],
+        "Source": ["OLD", "OLD", "OLD", "NEW", "NEW", "NEW"],
+        "Status": ["Active"] * 6,
+    })
+    stats = ManagerIndex(final_df).stats.set_index("Hiring Manager")
+    assert stats.loc["Ann", "Request Count (OLD)"] == 2
+    assert stats.loc["Bob", "Request Count (NEW)"] == 2
+
+    slim = _slim(final_df, ["Status", "Hiring Manager"])
+    assert slim.index.tolist() == [0, 2, 4]
+    assert slim["Request ID"].tolist()[:2] == ["1", "2"]
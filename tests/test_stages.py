@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from cache import QuotaExceeded, SharedCache
+from pipeline import compare_pipeline
+from stages import Stage, StagePipeline
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OLD = os.path.join(ROOT, "job_openings_dummy.csv")
+NEW = os.path.join(ROOT, "job_openings_dummy2.csv")
+
+
+def counting_pipeline():
+    calls = []
+
+    def stage(name, func):
+        def run(*args):
+            calls.append(name)
+            return func(*args)
+        return run
+
+    pipeline = StagePipeline({
+        "load": Stage(stage("load", lambda source: f"loaded {source}"), inputs=("source",)),
+        "compare": Stage(stage("compare", lambda loaded: loaded.upper()), deps=("load",)),
+        "filtered": Stage(
+            stage("filtered", lambda compared, manager: f"{compared} / {manager}"),
+            deps=("compare",), inputs=("manager",),
+        ),
+    })
+    return pipeline, calls
+
+
+def test_unchanged_inputs_are_memoized():
+    pipeline, calls = counting_pipeline()
+    pipeline.set_input("source", "a.csv")
+    pipeline.set_input("manager", "All")
+    assert pipeline.get("filtered") == "LOADED A.CSV / All"
+    assert pipeline.get("filtered") == "LOADED A.CSV / All"
+    assert calls == ["load", "compare", "filtered"]
+
+
+def test_filter_change_reruns_only_downstream_stage():
+    pipeline, calls = counting_pipeline()
+    pipeline.set_input("source", "a.csv")
+    pipeline.set_input("manager", "All")
+    pipeline.get("filtered")
+    pipeline.set_input("manager", "Bob")
+    assert pipeline.get("filtered") == "LOADED A.CSV / Bob"
+    assert calls == ["load", "compare", "filtered", "filtered"]
+
+
+def test_source_change_invalidates_every_dependent_stage():
+    pipeline, calls = counting_pipeline()
+    pipeline.set_input("source", "a.csv")
+    pipeline.set_input("manager", "All")
+    pipeline.get("filtered")
+    pipeline.set_input("source", "b.csv")
+    assert pipeline.get("filtered") == "LOADED B.CSV / All"
+    assert calls == ["load", "compare", "filtered"] * 2
+
+
+def test_token_stands_in_for_the_value():
+    pipeline, calls = counting_pipeline()
+    pipeline.set_input("source", "upload 1", token="file-id")
+    pipeline.get("load")
+    # Same token: the new value object is not compared, and load is not rerun
+    pipeline.set_input("source", "upload 1 (rerun)", token="file-id")
+    assert pipeline.get("load") == "loaded upload 1"
+    pipeline.set_input("source", "upload 2", token="other-id")
+    assert pipeline.get("load") == "loaded upload 2"
+    assert calls == ["load", "load"]
+
+
+def test_results_over_quota_are_turned_away():
+    shared = SharedCache(1 << 30, 1 << 30)
+    pipeline = compare_pipeline(cache=None, shared=shared)
+    pipeline.set_input("old", OLD)
+    pipeline.set_input("new", NEW)
+    pipeline.set_input("compact", False)
+    pipeline.get("compare")
+
+    shared.owner_quota = 1
+    pipeline.set_input("old", NEW)
+    pipeline.set_input("new", OLD)
+    with pytest.raises(QuotaExceeded):
+        pipeline.get("compare")
+    # The previous pair and comparison were released and dropped from the pipeline
+    assert shared.owners == 0
+    assert set(pipeline._results) == {"pair_key"}
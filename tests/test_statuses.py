@@ -0,0 +1,42 @@
+import pandas as pd
+
+from compare import has_active_status
+from pipeline import load_active_pair, unknown_statuses
+from statuses import STATUS_CLASSIFIER, status_counts
+
+
+def test_only_configured_active_statuses_are_active():
+    statuses = pd.Series([
+        "Active", " active ", "Partially Filled", "partiallyfilled", "Zero-Filled", "zero_filled",
+        "Filled", "Inactive", "Closed", "Cancelled", "canceled", "On Hold", "Reopened", None,
+    ])
+    assert list(has_active_status(statuses)) == [True] * 6 + [False] * 8
+
+
+def test_canonical_names_and_unknown_spellings():
+    canonical = STATUS_CLASSIFIER.canonical(pd.Series(["zero-filled", "CANCELED", " Reopened "]))
+    assert list(canonical) == ["Zero Filled", "Cancelled", "Reopened"]
+    assert STATUS_CLASSIFIER.unknown({"Active": 3, "Reopened": 2, "(blank)": 1}) == {"Reopened": 2}
+
+
+def test_unknown_statuses_sort_last():
+    order = STATUS_CLASSIFIER.sort_order(pd.Series(["Reopened", "Zero Filled", "Active"]))
+    assert order[0] > order[1] > order[2]
+
+
+def test_status_counts_merge_spellings():
+    counts = status_counts(pd.Series(["Active", "active", "Filled", None]))
+    assert counts.to_dict() == {"(blank)": 1, "Active": 2, "Filled": 1}
+
+
+def test_inactive_and_filled_rows_excluded_from_comparison(tmp_path):
+    path = tmp_path / "extract.csv"
+    pd.DataFrame({
+        "Request ID": ["R1", "R2", "R3", "R4", "R5", "R6"],
+        "Status": ["Active", "Inactive", "Filled", "Partially-Filled", "zerofilled", "Reopened"],
+    }).to_csv(path, index=False)
+
+    old_active, new_active = load_active_pair(path, path, cache=None)
+    assert list(old_active["Request ID"]) == ["R1", "R4", "R5"]
+    assert list(old_active["Status"].astype(str)) == ["Active", "Partially Filled", "Zero Filled"]
+    assert unknown_statuses(old_active) == {"Reopened": 1}
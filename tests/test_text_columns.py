@@ -0,0 +1,79 @@
+import gc
+import os
+import weakref
+
+import pandas as pd
+import pytest
+
+from loader import read_active
+from compare import has_active_status
+from pipeline import compare_files, load_active_pair
+from snapshots import SnapshotStore
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OLD = os.path.join(ROOT, "job_openings_dummy.csv")
+NEW = os.path.join(ROOT, "job_openings_dummy2.csv")
+TEXT = ["Work Site Address", "Description"]
+
+
+def full_active(path):
+    return read_active(path, keep=has_active_status, normalize=True, cache=None)
+
+
+def test_comparison_loads_no_free_text_columns():
+    old_active, new_active = load_active_pair(OLD, NEW, cache=None)
+    assert not set(TEXT) & set(old_active.columns)
+    assert not set(TEXT) & set(new_active.columns)
+
+
+@pytest.mark.parametrize("stored", [False, True])
+def test_free_text_columns_loaded_for_views(tmp_path, stored):
+    store = SnapshotStore(str(tmp_path)) if stored else None
+    result = compare_files(OLD, NEW, cache=None, store=store)
+    if stored:
+        # Free-text columns read while the uploads were at hand are stored with the snapshots
+        result.old_with_text, result.new_with_text
+        # Compare again from the stored snapshots alone
+        entries = {entry.name: entry for entry in store.entries()}
+        assert len(entries) == 2
+        result = compare_files(entries[OLD], entries[NEW], store=store)
+
+    for path, with_text in [(OLD, result.old_with_text), (NEW, result.new_with_text)]:
+        expected = full_active(path)
+        assert list(with_text.columns) == list(expected.columns)
+        pd.testing.assert_frame_equal(
+            with_text[TEXT].astype(object), expected[TEXT].astype(object), check_index_type=False
+        )
+
+
+def test_compact_comparison_has_no_free_text():
+    result = compare_files(OLD, NEW, compact=True, cache=None)
+    assert result.old_text is None
+    assert not set(TEXT) & set(result.old_with_text.columns)
+
+
+class Upload:
+    # Stands in for Streamlit's UploadedFile
+    def __init__(self, path):
+        self.name = os.path.basename(path)
+        with open(path, "rb") as fh:
+            self._data = fh.read()
+
+    def getvalue(self):
+        return self._data
+
+
+@pytest.mark.parametrize("stored", [False, True])
+def test_result_does_not_keep_uploads(tmp_path, stored):
+    store = SnapshotStore(str(tmp_path)) if stored else None
+    old, new = Upload(OLD), Upload(NEW)
+    refs = [weakref.ref(old), weakref.ref(new)]
+    result = compare_files(old, new, cache=None, store=store)
+    del old, new
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+    expected = full_active(OLD)
+    pd.testing.assert_frame_equal(
+        result.old_with_text[TEXT].astype(object), expected[TEXT].astype(object), check_index_type=False
+    )
@@ -0,0 +1,71 @@
+import os
+
+import pipeline
+from pipeline import extend_timeline
+from snapshots import SnapshotStore
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOTS = [
+    os.path.join(ROOT, name)
+    for name in ["job_openings_dummy.csv", "job_openings_dummy1.csv", "job_openings_dummy2.csv"]
+]
+
+
+def request_history(timeline, request_id):
+    history = timeline.history()
+    return history[history["Request ID"] == request_id]
+
+
+def test_move_to_inactive_status_is_a_transition():
+    # REQ1004 goes Active -> Closed -> Active across the bundled snapshots
+    timeline = extend_timeline(None, SNAPSHOTS, cache=None)
+    history = request_history(timeline, "REQ1004")
+    assert list(history["Change"]) == ["Added", "Status Changed", "Status Changed"]
+    assert list(history["Status (After)"]) == ["Active", "Closed", "Active"]
+
+    summary = timeline.request_summary().set_index("Request ID")
+    assert summary.loc["REQ1004", "Status Changes"] == 2
+
+    spent = timeline.time_in_status().set_index(["Request ID", "Status"])["Time in Status"]
+    assert spent["REQ1004", "Closed"] == 1
+
+
+def test_stored_snapshots_keep_every_status(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    uploaded = extend_timeline(None, SNAPSHOTS, cache=None, store=store)
+    stored = sorted(store.entries(), key=lambda s: s.name)
+    assert all(snapshot.id.endswith("-all-compact") for snapshot in stored)
+
+    reloaded = extend_timeline(None, stored, cache=None, store=store)
+    assert reloaded.history().equals(uploaded.history())
+
+
+class Upload:
+    # Stands in for Streamlit's UploadedFile
+    def __init__(self, path):
+        self.name = os.path.basename(path)
+        self.file_id = f"upload-{self.name}"
+        with open(path, "rb") as fh:
+            self._data = fh.read()
+
+    def getvalue(self):
+        return self._data
+
+
+def test_rerun_reuses_timeline_without_hashing(monkeypatch):
+    uploads = [Upload(path) for path in SNAPSHOTS]
+    timeline = extend_timeline(None, uploads[:2], cache=None)
+    history = timeline.history()
+    assert timeline.history() is history
+
+    def no_hashing(file):
+        raise AssertionError("uploads are keyed on file_id")
+    monkeypatch.setattr(pipeline, "file_digest", no_hashing)
+    assert extend_timeline(timeline, uploads[:2], cache=None) is timeline
+    assert timeline.request_summary() is timeline.request_summary()
+
+    monkeypatch.undo()
+    extended = extend_timeline(timeline, uploads, cache=None)
+    assert extended is timeline
+    assert len(extended.history()) > len(history)
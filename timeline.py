@@ -0,0 +1,169 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from compare import ADDED, DIFF_FIELDS, MANAGER_CHANGED, REMOVED, UNCHANGED, SnapshotDiff
+from normalize import key_codes
+
+
+HISTORY_COLUMNS = [
+    "Request ID",
+    "Snapshot",
+    "Change",
+    "Status (Before)",
+    "Status (After)",
+    "Hiring Manager (Before)",
+    "Hiring Manager (After)",
+    "Status Changed?",
+    "Manager Changed?",
+]
+
+
+def snapshot_date(name):
+    # Weekly extracts are usually named with their date, e.g. openings_2026-03-02.xlsx
+    match = re.search(r"\d{4}-\d{2}-\d{2}", name)
+    return pd.Timestamp(match.group()) if match else None
+
+
+def _slim(snapshot, fields):
+    columns = ["Request ID"] + [field for field in fields if field in snapshot.columns]
+    # First row per Request ID, found on the integer codes rather than the strings
+    _, (request_keys,) = key_codes(snapshot["Request ID"])
+    _, first = np.unique(request_keys, return_index=True)
+    return snapshot[columns].iloc[np.sort(first)]
+
+
+class Timeline:
+    """Per-request change history across N snapshots, built one snapshot at a time.
+
+    Each added snapshot is diffed against the previous one only; earlier
+    snapshots are never revisited.
+    """
+
+    def __init__(self, fields=DIFF_FIELDS):
+        self.fields = list(fields)
+        self.keys = []
+        self.labels = []
+        self.times = []
+        self._previous = None
+        self._events = []
+        self._spans = []
+        # history() and request_summary(), built once per added snapshot
+        self._results = {}
+        # Request ID -> current Status and the time it entered that status
+        self._state = pd.DataFrame(
+            {"Status": pd.Series(dtype=object), "Since": pd.Series(dtype=object)},
+            index=pd.Index([], name="Request ID"),
+        )
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add(self, snapshot, label, at=None, key=None):
+        # `at` is the snapshot's date; without one, time is counted in snapshots
+        at = len(self.labels) if at is None else at
+        current = _slim(snapshot, self.fields)
+        previous = self._previous if self._previous is not None else current.iloc[:0]
+
+        diff = SnapshotDiff(previous, current, self.fields)
+        changed = (diff.change != UNCHANGED).to_numpy()
+        events = diff.table[changed].copy()
+        events.columns = [
+            col.replace("(OLD)", "(Before)").replace("(NEW)", "(After)") for col in events.columns
+        ]
+        events.insert(0, "Snapshot", label)
+        events.insert(1, "Change", diff.change[changed])
+        events["Status Changed?"] = diff.changed["Status"][changed]
+        no_change = np.zeros(len(changed), dtype=bool)
+        events["Manager Changed?"] = diff.changed.get("Hiring Manager", no_change)[changed]
+        self._events.append(events.reset_index())
+
+        self._advance(diff, at)
+        self._previous = current
+        self._results.clear()
+        self.keys.append(label if key is None else key)
+        self.labels.append(label)
+        self.times.append(at)
+        return diff
+
+    def _advance(self, diff, at):
+        status_changed = diff.changed["Status"]
+        leaving = diff.table.index[(diff.in_old & ~diff.in_new) | status_changed]
+        entering = diff.table.index[(~diff.in_old & diff.in_new) | status_changed]
+
+        # Close the open interval of every request that left its status
+        closed = self._state.loc[self._state.index.intersection(leaving)]
+        if not closed.empty:
+            self._spans.append(closed.assign(Until=at).reset_index())
+
+        state = self._state.drop(leaving, errors="ignore")
+        opened = pd.DataFrame(
+            {"Status": diff.table.loc[entering, "Status (NEW)"].astype(object), "Since": at},
+            index=pd.Index(entering, name="Request ID"),
+        )
+        self._state = pd.concat([state, opened]) if not state.empty else opened
+
+    # ------------------ Results ------------------
+    def _cached(self, name, build):
+        # The same frame until the next add(), so reruns neither rebuild it nor miss
+        # the grid's per-frame cache
+        if name not in self._results:
+            self._results[name] = build()
+        return self._results[name]
+
+    def history(self):
+        return self._cached("history", self._history)
+
+    def _history(self):
+        if not self._events:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        history = pd.concat(self._events, ignore_index=True)
+        return history.reindex(columns=[col for col in HISTORY_COLUMNS if col in history.columns])
+
+    def transition_counts(self):
+        # How often each Status -> Status move happened; (new)/(removed) stand in for a missing side
+        history = self.history()
+        moves = history[history["Change"] != MANAGER_CHANGED]
+        before = moves["Status (Before)"].astype(object).where(moves["Change"] != ADDED, "(new)")
+        after = moves["Status (After)"].astype(object).where(moves["Change"] != REMOVED, "(removed)")
+        return (
+            pd.DataFrame({"From": before.fillna("(new)"), "To": after.fillna("(removed)")})
+            .groupby(["From", "To"]).size()
+            .rename("Count")
+            .reset_index()
+            .sort_values("Count", ascending=False, ignore_index=True)
+        )
+
+    def time_in_status(self):
+        # Closed intervals plus the still-open ones, measured up to the latest snapshot
+        spans = list(self._spans)
+        if self.times and not self._state.empty:
+            spans.append(self._state.assign(Until=self.times[-1]).reset_index())
+        if not spans:
+            return pd.DataFrame(columns=["Request ID", "Status", "Time in Status"])
+        spans = pd.concat(spans, ignore_index=True).infer_objects()
+        spans["Time in Status"] = spans["Until"] - spans["Since"]
+        return (
+            spans.groupby(["Request ID", "Status"])["Time in Status"].sum().reset_index()
+        )
+
+    def request_summary(self):
+        return self._cached("request_summary", self._request_summary)
+
+    def _request_summary(self):
+        history = self.history()
+        if history.empty:
+            return pd.DataFrame()
+        grouped = history.groupby("Request ID")
+        summary = pd.DataFrame({
+            "First Seen": grouped["Snapshot"].first(),
+            "Last Change": grouped["Snapshot"].last(),
+            "Status Changes": grouped["Status Changed?"].sum(),
+            "Manager Changes": grouped["Manager Changed?"].sum(),
+        })
+        current = self._state.reindex(summary.index).infer_objects()
+        summary["Current Status"] = current["Status"].fillna("(removed)")
+        if self.times:
+            summary["Time in Current Status"] = self.times[-1] - current["Since"]
+        return summary.reset_index()